@@ -1,3 +1,5 @@
+import os
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -19,6 +21,25 @@ class Settings(BaseSettings):
     refresh_token_expire_time: int = Field(60, alias="REFRESH_TOKEN_EXPIRE_TIME")
     auth_jwt_key: str = Field(alias="AUTH_JWT_KEY")
     jwt_algorithm: str = Field("HS256", alias="JWT_ALGORITHM")
+    revoked_tokens_local_size: int = Field(100_000, alias="REVOKED_TOKENS_LOCAL_SIZE")
+    decoded_tokens_cache_size: int = Field(10_000, alias="DECODED_TOKENS_CACHE_SIZE")
+    # Older releases denylisted the full token for 60 minutes. Turn on for the first hour after upgrading,
+    # it costs a Redis lookup on every validation
+    legacy_revocation_check: bool = Field(False, alias="LEGACY_REVOCATION_CHECK")
+
+    user_profile_cache_ttl: int = Field(300, alias="USER_PROFILE_CACHE_TTL")
+    user_profile_local_ttl: float = Field(30.0, alias="USER_PROFILE_LOCAL_TTL")
+    user_profile_local_size: int = Field(10_000, alias="USER_PROFILE_LOCAL_SIZE")
+
+    # Embeds roles and permissions into tokens, so roles_required authorizes without a DB query
+    token_permission_claims: bool = Field(False, alias="TOKEN_PERMISSION_CLAIMS")
+    permission_version_local_ttl: float = Field(5.0, alias="PERMISSION_VERSION_LOCAL_TTL")
+    permission_version_local_size: int = Field(10_000, alias="PERMISSION_VERSION_LOCAL_SIZE")
+
+    # Full werkzeug method with its cost, e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+    password_hash_method: str = Field("scrypt:32768:8:1", alias="PASSWORD_HASH_METHOD")
+    password_hash_workers: int = Field(max(1, (os.cpu_count() or 2) - 1), alias="PASSWORD_HASH_WORKERS")
+    password_hash_concurrency: int = Field(16, alias="PASSWORD_HASH_CONCURRENCY")
 
     yandex_secret_id: str = Field(alias="YANDEX_SECRET_ID")
 
@@ -10,3 +10,31 @@ class AbstractCacheStorage(ABC):
     @abstractmethod
     async def set(self, key: str, data: str, exp: timedelta | int, **kwargs):
         pass
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        pass
+
+    @abstractmethod
+    async def incr_many(self, keys: list[str], exp: timedelta | int | None = None) -> list[int]:
+        pass
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        pass
+
+    @abstractmethod
+    async def mget(self, keys: list[str]) -> list:
+        pass
+
+    @abstractmethod
+    async def scan_keys(self, pattern: str) -> list[str]:
+        pass
+
+    @abstractmethod
+    async def publish(self, channel: str, data: str):
+        pass
+
+    @abstractmethod
+    def pubsub(self):
+        pass
@@ -16,6 +16,33 @@ class RedisCacheStorage(AbstractCacheStorage):
     async def set(self, key: str, data: str, exp: timedelta | int, **kwargs):
         await self.redis.set(key, data, exp)
 
+    async def incr(self, key: str) -> int:
+        return await self.redis.incr(key)
+
+    async def incr_many(self, keys: list[str], exp: timedelta | int | None = None) -> list[int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                if exp is not None:
+                    pipe.expire(key, exp)
+            results = await pipe.execute()
+        return results[:: 1 if exp is None else 2]
+
+    async def delete(self, *keys: str):
+        await self.redis.delete(*keys)
+
+    async def mget(self, keys: list[str]) -> list:
+        return await self.redis.mget(keys) if keys else []
+
+    async def scan_keys(self, pattern: str) -> list[str]:
+        return [key async for key in self.redis.scan_iter(match=pattern, count=1000)]
+
+    async def publish(self, channel: str, data: str):
+        await self.redis.publish(channel, data)
+
+    def pubsub(self):
+        return self.redis.pubsub()
+
 
 async def get_cache() -> AbstractCacheStorage | None:
     return RedisCacheStorage(cache_client)
@@ -1,3 +1,5 @@
+import asyncio
+
 import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.responses import ORJSONResponse
@@ -17,6 +19,9 @@ from api.v1.role.user_roles import router as user_roles_router
 from db.cache import redis_cache
 from core.config import settings
 from mock_data.create_user import create_test_users
+from services.password_hasher import close_password_pool
+from services.token_denylist import token_denylist
+from services.user_profile_cache import user_profiles
 
 
 @asynccontextmanager
@@ -24,8 +29,18 @@ async def lifespan(fast_api_app: FastAPI):
     async with Redis(
         host=settings.redis_host, port=settings.redis_port, db=0, decode_responses=True
     ) as redis_cache.cache_client:
+        cache = redis_cache.RedisCacheStorage(redis_cache.cache_client)
+        sync_tasks = [
+            asyncio.create_task(token_denylist.sync(cache)),
+            asyncio.create_task(user_profiles.sync(cache)),
+        ]
         await create_test_users()
         yield
+        for task in sync_tasks:
+            task.cancel()
+        # Their cleanup resets the pub/sub connections, which needs the client still open
+        await asyncio.gather(*sync_tasks, return_exceptions=True)
+    close_password_pool()
 
 
 def configure_tracer() -> None:
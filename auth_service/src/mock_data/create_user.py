@@ -1,9 +1,12 @@
+import asyncio
+
 from sqlalchemy import select
 
 from models.base import Base
 from models.user import User
 from db.postgres import engine, async_session
 from mock_data.data import test_users
+from services.password_hasher import hash_password
 
 
 async def create_test_users():
@@ -11,17 +14,21 @@ async def create_test_users():
         await conn.run_sync(Base.metadata.create_all)
 
     async with async_session() as client:
+        new_users = []
         for user_data in test_users:
-            username = user_data["username"]
-            password = user_data["password"]
-            first_name = user_data["first_name"]
-            last_name = user_data["last_name"]
-
-            existing_user = await client.execute(select(User).where(User.username == username))
-            if existing_user.scalar() is not None:
-                continue
+            existing_user = await client.execute(select(User).where(User.username == user_data["username"]))
+            if existing_user.scalar() is None:
+                new_users.append(user_data)
 
-            user = User(username=username, password=password, first_name=first_name, last_name=last_name)
+        password_hashes = await asyncio.gather(*[hash_password(user_data["password"]) for user_data in new_users])
+        for user_data, password_hash in zip(new_users, password_hashes):
+            user = User(
+                username=user_data["username"],
+                password=user_data["password"],
+                first_name=user_data["first_name"],
+                last_name=user_data["last_name"],
+                password_hash=password_hash,
+            )
             client.add(user)
 
         await client.commit()
@@ -6,10 +6,11 @@ from datetime import datetime
 from sqlalchemy import DateTime, Boolean, Text
 from sqlalchemy.orm import backref
 from sqlalchemy_utils import ChoiceType
-from werkzeug.security import check_password_hash, generate_password_hash
+from werkzeug.security import generate_password_hash
 
 from .base import BaseModel
 from models.role import *
+from core.config import settings
 
 
 class User(BaseModel):
@@ -29,10 +30,18 @@ class User(BaseModel):
     # friendships_as_friend = relationship('Friendship', back_populates='friend', cascade="all,delete")
 
     def __init__(
-        self, username: str, password: str, first_name: str, last_name: str, is_super_user=False, user_system_data=None
+        self,
+        username: str,
+        password: str,
+        first_name: str,
+        last_name: str,
+        is_super_user=False,
+        user_system_data=None,
+        password_hash: str | None = None,
     ) -> None:
+        """Async callers should pass `password_hash` from the password pool, otherwise hashing blocks the caller."""
         self.username = username
-        self.password = self.password = generate_password_hash(password)
+        self.password = password_hash or generate_password_hash(password, settings.password_hash_method)
         self.first_name = first_name
         self.last_name = last_name
 
@@ -42,9 +51,6 @@ class User(BaseModel):
         user_system_data.__setattr__("is_superuser", is_super_user)
         self.user_system_data = user_system_data
 
-    async def check_password(self, password: str) -> bool:
-        return check_password_hash(self.password, password)
-
     def __repr__(self) -> str:
         return f"<User {self.username}>"
 
@@ -1,4 +1,7 @@
+import logging
+
 from fastapi import Depends
+from redis.exceptions import ConnectionError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.v1.auth.schemas import UserCreate, UserLogin
@@ -9,10 +12,16 @@ from db.postgres import get_session
 from exceptions.exceptions import AuthorizationException
 from services.user_service import UserService
 from services.token_utils import TokenUtil
+from services.user_profile_cache import user_profiles
+from services.permission_snapshot import ACCESS_CLAIM, build_access_claim, permission_versions
+from core.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
     def __init__(self, cache: AbstractCacheStorage, session: AsyncSession):
+        self.cache = cache
         self.token_util = TokenUtil(cache)
         self.user_service = UserService(session)
 
@@ -22,7 +31,7 @@ class AuthService:
     async def login(self, user_dto: UserLogin, user_agent: str) -> dict:
         user = await self.user_service.check_credentials(user_dto)
 
-        tokens = self.token_util.create_tokens(base_payload={"sub": str(user.id)})
+        tokens = self.token_util.create_tokens(base_payload=await self._build_base_payload(str(user.id)))
 
         await self.user_service.add_auth_session(user.id, tokens)
         await self.user_service.add_auth_history(user.id, user_agent)
@@ -57,7 +66,7 @@ class AuthService:
         await self.token_util.revoke_token(auth_session.access_token)
         await self.token_util.revoke_token(auth_session.refresh_token)
 
-        tokens = self.token_util.create_tokens(base_payload={"sub": payload.get("sub")})
+        tokens = self.token_util.create_tokens(base_payload=await self._build_base_payload(payload.get("sub")))
         await self.user_service.add_auth_session(payload.get("sub"), tokens)
 
         return tokens
@@ -77,6 +86,7 @@ class AuthService:
             raise AuthorizationException
 
         await self.user_service.reset_username(payload.get("sub"), new_username)
+        await user_profiles.invalidate(self.cache, payload.get("sub"))
 
     async def verify_access_token(self, access_token: str):
         payload = await self.token_util.validate_access_token(access_token)
@@ -84,7 +94,10 @@ class AuthService:
         if not payload:
             raise AuthorizationException
 
-        return await self.user_service.get_user_with_roles(payload.get("sub"))
+        user_id = payload.get("sub")
+        return await user_profiles.get_or_load(
+            self.cache, user_id, lambda: self.user_service.get_user_with_roles(user_id)
+        )
 
     async def verify_user_credentials(self, user_dto: UserLogin):
         user = await self.user_service.check_credentials(user_dto)
@@ -98,6 +111,20 @@ class AuthService:
 
         return await self.user_service.get_all_users(payload.get("sub"))
 
+    async def _build_base_payload(self, user_id: str) -> dict:
+        base_payload = {"sub": user_id}
+        if settings.token_permission_claims:
+            try:
+                # Read before the roles, so a change made meanwhile leaves the claim with a stale version
+                version = await permission_versions.get(self.cache, user_id)
+            except ConnectionError:
+                # Without a version the claim could not be checked, roles_required falls back to Postgres
+                logger.error("Redis is unavailable, token for user %s is issued without the access claim", user_id)
+                return base_payload
+            access = await self.user_service.get_user_access(user_id)
+            base_payload[ACCESS_CLAIM] = build_access_claim(access["roles"], access["permissions"], version)
+        return base_payload
+
 
 def get_auth_service(cache: AbstractCacheStorage = Depends(get_cache), session: AsyncSession = Depends(get_session)):
     return AuthService(cache, session)
@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from core.config import settings
+
+password_pool: ProcessPoolExecutor | None = None
+password_slots: asyncio.Semaphore | None = None
+
+
+def get_password_pool() -> tuple[ProcessPoolExecutor, asyncio.Semaphore]:
+    """KDF work runs in worker processes, the semaphore caps how much of it may be queued at once.
+
+    Logins beyond the cap wait on the semaphore instead of piling up in the
+    pool, and the pool leaves a core to the event loop serving token checks.
+    """
+    global password_pool, password_slots
+    if password_pool is None:
+        password_pool = ProcessPoolExecutor(max_workers=settings.password_hash_workers)
+        password_slots = asyncio.Semaphore(settings.password_hash_concurrency)
+    return password_pool, password_slots
+
+
+async def run_in_password_pool(function, *args):
+    pool, slots = get_password_pool()
+    async with slots:
+        return await asyncio.get_running_loop().run_in_executor(pool, function, *args)
+
+
+async def hash_password(password: str) -> str:
+    return await run_in_password_pool(generate_password_hash, password, settings.password_hash_method)
+
+
+async def verify_password(password_hash: str, password: str) -> bool:
+    return await run_in_password_pool(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """Hashes made with another algorithm or cost than PASSWORD_HASH_METHOD are upgraded on login."""
+    return password_hash.split("$", 1)[0] != settings.password_hash_method
+
+
+def close_password_pool():
+    global password_pool, password_slots
+    if password_pool is not None:
+        password_pool.shutdown(wait=False, cancel_futures=True)
+        password_pool = None
+        password_slots = None
@@ -0,0 +1,83 @@
+import time
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException, status
+from redis.exceptions import ConnectionError
+
+from core.config import settings
+from db.cache.abstract_cache import AbstractCacheStorage
+
+logger = logging.getLogger(__name__)
+
+VERSION_PREFIX = "permissions_version:"
+ACCESS_CLAIM = "acl"
+
+
+def build_access_claim(roles: list[str], permissions: list[str], version: int) -> dict:
+    return {"r": roles, "p": permissions, "v": version}
+
+
+class PermissionVersions:
+    """Per-user counters bumped on every change to the user's roles or their permissions.
+
+    A token access claim is trusted only while its version matches the
+    counter. Counters are cached locally for a short TTL, so a change made on
+    another worker takes effect there within that TTL.
+    """
+
+    def __init__(self, local_ttl: float, local_size: int):
+        self.local_ttl = local_ttl
+        self.local_size = local_size
+        self.local: dict[str, tuple[float, int]] = {}
+
+    async def get(self, cache: AbstractCacheStorage, user_id: str) -> int:
+        entry = self.local.get(user_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        version = int(await cache.get(VERSION_PREFIX + user_id) or 0)
+        if len(self.local) >= self.local_size:
+            self.local.clear()
+        self.local[user_id] = (time.monotonic() + self.local_ttl, version)
+        return version
+
+    async def bump(self, cache: AbstractCacheStorage, *user_ids: str):
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self.local.pop(user_id, None)
+        await cache.incr_many([VERSION_PREFIX + user_id for user_id in user_ids])
+
+    @asynccontextmanager
+    async def changing(self, cache: AbstractCacheStorage, *user_ids: str):
+        """Wraps the commit of a change to the roles of `user_ids`.
+
+        The versions are bumped before the commit, so a change is never committed
+        while tokens carrying the old claim stay valid, and again after it, for
+        tokens issued while the change was being committed.
+        """
+        if not settings.token_permission_claims or not user_ids:
+            yield
+            return
+        try:
+            await self.bump(cache, *user_ids)
+        except ConnectionError:
+            logger.error("Redis is unavailable, role change is rejected")
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Redis is unavailable")
+        yield
+        try:
+            await self.bump(cache, *user_ids)
+        except ConnectionError:
+            logger.error("Redis is unavailable, tokens issued during the role change keep their claim")
+
+    async def matches(self, cache: AbstractCacheStorage, user_id: str, claim: dict | None) -> bool:
+        if claim is None:
+            return False
+        try:
+            return claim.get("v") == await self.get(cache, user_id)
+        except ConnectionError:
+            return False
+
+
+permission_versions = PermissionVersions(settings.permission_version_local_ttl, settings.permission_version_local_size)
@@ -9,8 +9,10 @@ from opentelemetry import trace
 from db.postgres import get_session
 from db.cache.redis_cache import get_cache
 from db.cache.abstract_cache import AbstractCacheStorage
-from models.role import Role, Permission
+from models.role import Role, Permission, UserRole
 from services.token_utils import TokenUtil
+from services.user_profile_cache import user_profiles
+from services.permission_snapshot import permission_versions
 from exceptions.exceptions import AuthorizationException, EntityNotFoundException, DuplicateEntityException
 from api.v1.role.schemas import RoleCreate, RoleUpdate, RoleResponse
 
@@ -19,6 +21,7 @@ tracer = trace.get_tracer(__name__)
 
 class RoleService:
     def __init__(self, cache: AbstractCacheStorage, db_session: AsyncSession):
+        self.cache = cache
         self.token_util = TokenUtil(cache)
         self.db_session = db_session
 
@@ -82,7 +85,13 @@ class RoleService:
         await self._update_role_name(role, role_data)
         await self._update_role_permissions(role, role_data)
 
-        await self._commit_and_refresh(role)
+        holders = []
+        if role_data.name is not None or role_data.permission_names is not None:
+            holders = await self._get_role_holders(role_id)
+        async with permission_versions.changing(self.cache, *holders):
+            await self._commit_and_refresh(role)
+        if role_data.name is not None:
+            await user_profiles.invalidate(self.cache, *holders)
 
         role_to_update = {
             "id": role.id,
@@ -105,9 +114,12 @@ class RoleService:
 
             if role is None:
                 raise EntityNotFoundException
+            holders = await self._get_role_holders(role_id)
             with tracer.start_as_current_span("delete_role_commit"):
-                await self.db_session.delete(role)
-                await self.db_session.commit()
+                async with permission_versions.changing(self.cache, *holders):
+                    await self.db_session.delete(role)
+                    await self.db_session.commit()
+            await user_profiles.invalidate(self.cache, *holders)
 
             return {"message": f"Role {role.name} successfully deleted"}
 
@@ -131,6 +143,11 @@ class RoleService:
                 raise AuthorizationException
             return payload
 
+    async def _get_role_holders(self, role_id: UUID) -> list[str]:
+        with tracer.start_as_current_span("query_role_holders"):
+            user_ids = await self.db_session.scalars(select(UserRole.user_id).where(UserRole.role_id == role_id))
+        return [str(user_id) for user_id in user_ids]
+
     async def _query_role(self, role_id: UUID):
         with tracer.start_as_current_span("query_role"):
             role = await self.db_session.scalar(
@@ -0,0 +1,50 @@
+import copy
+import time
+import hashlib
+from collections import OrderedDict
+
+from core.config import settings
+
+
+def get_token_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class DecodedTokenCache:
+    """Bounded LRU of verified JWT payloads keyed by token digest.
+
+    An entry lives until the token `exp`, so a cached payload is never served
+    for a token jose would reject as expired. Revocation is still checked on
+    every validation, the cache only saves the signature check and parsing.
+    Callers get their own copy of the payload, so changing one never leaks
+    into later validations.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict[bytes, dict] = OrderedDict()
+
+    def get(self, digest: bytes) -> dict | None:
+        payload = self.entries.get(digest)
+        if payload is None:
+            return None
+        if payload["exp"] <= time.time():
+            del self.entries[digest]
+            return None
+        self.entries.move_to_end(digest)
+        return copy.deepcopy(payload)
+
+    def set(self, digest: bytes, payload: dict):
+        self.entries[digest] = copy.deepcopy(payload)
+        self.entries.move_to_end(digest)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, digest: bytes):
+        self.entries.pop(digest, None)
+
+    def clear(self):
+        self.entries.clear()
+
+
+decoded_tokens = DecodedTokenCache(settings.decoded_tokens_cache_size)
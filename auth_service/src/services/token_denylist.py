@@ -0,0 +1,80 @@
+import time
+import asyncio
+import logging
+
+from redis.exceptions import ConnectionError
+
+from core.config import settings
+from db.cache.abstract_cache import AbstractCacheStorage
+
+logger = logging.getLogger(__name__)
+
+REVOKED_PREFIX = "revoked:"
+REVOCATION_CHANNEL = "revoked_tokens"
+
+
+class TokenDenylist:
+    """Process-local copy of the revoked jtis, kept in sync through Redis pub/sub.
+
+    A jti found here is revoked without asking Redis. A miss is trusted only
+    while the copy is complete: the listener is subscribed, the initial load
+    from Redis is done and the size limit was never hit. Otherwise callers
+    fall back to a Redis lookup.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: dict[str, float] = {}
+        self.synced = False
+        self.complete = True
+
+    def add(self, jti: str, exp: float):
+        if len(self.entries) >= self.max_size:
+            self.prune(time.time())
+        if len(self.entries) >= self.max_size:
+            self.complete = False
+            return
+        self.entries[jti] = exp
+
+    def prune(self, now: float):
+        self.entries = {jti: exp for jti, exp in self.entries.items() if exp > now}
+
+    def is_revoked(self, jti: str) -> bool | None:
+        """True or False when the local copy knows the answer, None when Redis has to be asked."""
+        exp = self.entries.get(jti)
+        if exp is not None and exp > time.time():
+            return True
+        if self.synced and self.complete:
+            return False
+        return None
+
+    async def load(self, cache: AbstractCacheStorage):
+        self.entries = {}
+        self.complete = True
+        keys = await cache.scan_keys(f"{REVOKED_PREFIX}*")
+        for key, exp in zip(keys, await cache.mget(keys)):
+            if exp is not None:
+                self.add(key[len(REVOKED_PREFIX) :], float(exp))
+
+    async def sync(self, cache: AbstractCacheStorage, retry_delay: float = 1.0):
+        """Follows revocations of all workers, reloading the denylist after every reconnect."""
+        while True:
+            pubsub = cache.pubsub()
+            try:
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                # Subscribed first, so revocations made during the load are not missed
+                await self.load(cache)
+                self.synced = True
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        jti, exp = message["data"].split(" ", 1)
+                        self.add(jti, float(exp))
+            except ConnectionError:
+                logger.error("Redis is unavailable, token denylist falls back to Redis lookups")
+            finally:
+                self.synced = False
+                await pubsub.reset()
+            await asyncio.sleep(retry_delay)
+
+
+token_denylist = TokenDenylist(settings.revoked_tokens_local_size)
@@ -1,12 +1,17 @@
+import time
 import uuid
+import logging
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from opentelemetry import trace
 
 from core.config import settings
 from db.cache.abstract_cache import AbstractCacheStorage
+from services.token_cache import decoded_tokens, get_token_digest
+from services.token_denylist import REVOCATION_CHANNEL, REVOKED_PREFIX, token_denylist
 
 tracer = trace.get_tracer(__name__)
+logger = logging.getLogger(__name__)
 
 
 class TokenUtil:
@@ -48,10 +53,14 @@ class TokenUtil:
     async def validate_token(self, token: str, token_type: str) -> dict | None:
         with tracer.start_as_current_span("validate_token"):
             try:
-                payload = jwt.decode(token, key=settings.auth_jwt_key, algorithms=[settings.jwt_algorithm])
+                digest = get_token_digest(token)
+                payload = decoded_tokens.get(digest)
+                if payload is None:
+                    payload = jwt.decode(token, key=settings.auth_jwt_key, algorithms=[settings.jwt_algorithm])
+                    decoded_tokens.set(digest, payload)
 
                 is_invalid_type = payload.get("type") != token_type
-                is_revoked = await self._is_token_revoked(token)
+                is_revoked = await self._is_token_revoked(token, payload)
 
                 if is_invalid_type or is_revoked:
                     raise JWTError
@@ -60,12 +69,32 @@ class TokenUtil:
             except JWTError:
                 return None
 
-    async def revoke_token(self, token: str, exp: timedelta | int = timedelta(minutes=60)):
+    async def revoke_token(self, token: str):
+        """Denylists the token jti until the token expires on its own."""
         with tracer.start_as_current_span("TokenUtil.revoke_token"):
-            await self.cache.set(key=token, data=token, exp=exp)
-
-    async def _is_token_revoked(self, token: str) -> bool:
-        if await self.cache.get(token):
+            # The token was issued by us, an expired one just needs no entry
+            claims = jwt.get_unverified_claims(token)
+            ttl = int(claims["exp"] - time.time()) + 1
+            if ttl <= 0 or "jti" not in claims:
+                # Tokens without a jti never pass validation, there is nothing to denylist
+                return
+
+            await self.cache.set(key=REVOKED_PREFIX + claims["jti"], data=str(claims["exp"]), exp=ttl)
+            token_denylist.add(claims["jti"], claims["exp"])
+            decoded_tokens.invalidate(get_token_digest(token))
+            await self.cache.publish(REVOCATION_CHANNEL, f"{claims['jti']} {claims['exp']}")
+
+    async def _is_token_revoked(self, token: str, payload: dict) -> bool:
+        jti = payload.get("jti")
+        if jti is None:
+            # Every token is issued with a jti, one without it is rejected rather than left unrevocable
+            logger.warning("Rejected a token without jti")
             return True
 
-        return False
+        is_revoked = token_denylist.is_revoked(jti)
+        if is_revoked is None:
+            is_revoked = await self.cache.get(REVOKED_PREFIX + jti) is not None
+        if not is_revoked and settings.legacy_revocation_check:
+            is_revoked = await self.cache.get(token) is not None
+
+        return is_revoked
@@ -0,0 +1,114 @@
+import copy
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+import orjson
+from redis.exceptions import ConnectionError
+
+from core.config import settings
+from db.cache.abstract_cache import AbstractCacheStorage
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PREFIX = "user_profile:"
+GENERATION_PREFIX = "user_profile_generation:"
+PROFILE_CHANNEL = "user_profile_invalidated"
+
+
+class UserProfileCache:
+    """Read-through cache of the verify_token payload: a process-local LRU in front of Redis.
+
+    Changes to a user's name or roles invalidate the Redis entry and are
+    published, so every worker drops its local copy as well. The local TTL
+    bounds staleness while the invalidation channel is down. Local entries are
+    copied in and out, so callers never share a profile dict.
+    """
+
+    def __init__(self, ttl: int, local_ttl: float, local_size: int):
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.local_size = local_size
+        self.local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def get_local(self, user_id: str) -> dict | None:
+        entry = self.local.get(user_id)
+        if entry is None:
+            return None
+        expires_at, profile = entry
+        if expires_at <= time.monotonic():
+            del self.local[user_id]
+            return None
+        self.local.move_to_end(user_id)
+        return copy.deepcopy(profile)
+
+    def set_local(self, user_id: str, profile: dict):
+        self.local[user_id] = (time.monotonic() + self.local_ttl, copy.deepcopy(profile))
+        self.local.move_to_end(user_id)
+        while len(self.local) > self.local_size:
+            self.local.popitem(last=False)
+
+    async def get_or_load(
+        self, cache: AbstractCacheStorage, user_id: str, loader: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        profile = self.get_local(user_id)
+        if profile is not None:
+            return profile
+
+        try:
+            cached, generation = await cache.mget([PROFILE_PREFIX + user_id, GENERATION_PREFIX + user_id])
+        except ConnectionError:
+            cached = generation = None
+        if cached is not None:
+            profile = orjson.loads(cached)
+            self.set_local(user_id, profile)
+            return profile
+
+        profile = await loader()
+        try:
+            # An invalidation during the load bumps the generation, the loaded profile may predate it
+            if await cache.get(GENERATION_PREFIX + user_id) != generation:
+                return profile
+            await cache.set(key=PROFILE_PREFIX + user_id, data=orjson.dumps(profile).decode("utf-8"), exp=self.ttl)
+        except ConnectionError:
+            logger.error("Redis is unavailable, user profile %s is cached locally only", user_id)
+
+        self.set_local(user_id, profile)
+        return profile
+
+    async def invalidate(self, cache: AbstractCacheStorage, *user_ids: str):
+        if not user_ids:
+            return
+        for user_id in user_ids:
+            self.local.pop(user_id, None)
+        try:
+            await cache.incr_many([GENERATION_PREFIX + user_id for user_id in user_ids], exp=self.ttl)
+            await cache.delete(*[PROFILE_PREFIX + user_id for user_id in user_ids])
+            for user_id in user_ids:
+                await cache.publish(PROFILE_CHANNEL, user_id)
+        except ConnectionError:
+            logger.error("Redis is unavailable, user profiles %s expire by TTL only", ", ".join(user_ids))
+
+    async def sync(self, cache: AbstractCacheStorage, retry_delay: float = 1.0):
+        """Drops local profiles invalidated by other workers."""
+        while True:
+            pubsub = cache.pubsub()
+            try:
+                await pubsub.subscribe(PROFILE_CHANNEL)
+                # Invalidations sent while unsubscribed are lost, so nothing cached before is trusted
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.local.pop(message["data"], None)
+            except ConnectionError:
+                logger.error("Redis is unavailable, local user profiles expire by TTL only")
+            finally:
+                await pubsub.reset()
+            await asyncio.sleep(retry_delay)
+
+
+user_profiles = UserProfileCache(
+    settings.user_profile_cache_ttl, settings.user_profile_local_ttl, settings.user_profile_local_size
+)
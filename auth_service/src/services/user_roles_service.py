@@ -13,6 +13,9 @@ from db.cache.abstract_cache import AbstractCacheStorage
 from models.user import User
 from models.role import UserRole, Role
 from services.token_utils import TokenUtil
+from services.user_profile_cache import user_profiles
+from services.permission_snapshot import ACCESS_CLAIM, permission_versions
+from core.config import settings
 from exceptions.exceptions import AuthorizationException, EntityNotFoundException, DuplicateEntityException
 
 tracer = trace.get_tracer(__name__)
@@ -20,6 +23,7 @@ tracer = trace.get_tracer(__name__)
 
 class UserRoleService:
     def __init__(self, cache: AbstractCacheStorage, db_session: AsyncSession):
+        self.cache = cache
         self.token_util = TokenUtil(cache)
         self.db_session = db_session
 
@@ -31,15 +35,29 @@ class UserRoleService:
             if not payload:
                 raise AuthorizationException
 
-            with tracer.start_as_current_span("get_roles_current_user"):
-                user_data = await self.db_session.execute(
-                    select(User)
-                    .options(joinedload(User.user_roles).joinedload(UserRole.role))
-                    .where(User.id == user_id)
-                )
-            user = user_data.scalar()
-            role_names = [item.role.name for item in user.user_roles]
-            return role_names
+            return await self.get_role_names(user_id)
+
+    async def get_role_names(self, user_id: str) -> list[str]:
+        with tracer.start_as_current_span("get_role_names"):
+            user_data = await self.db_session.execute(
+                select(User).options(joinedload(User.user_roles).joinedload(UserRole.role)).where(User.id == user_id)
+            )
+        user = user_data.scalar()
+        return [item.role.name for item in user.user_roles]
+
+    async def get_roles_for_authorization(self, access_token: str) -> list[str]:
+        """Takes the roles from the token claim while its version is current, otherwise from Postgres."""
+        if settings.token_permission_claims:
+            payload = await self.token_util.validate_access_token(access_token)
+            if not payload:
+                raise AuthorizationException
+
+            claim = payload.get(ACCESS_CLAIM)
+            if await permission_versions.matches(self.cache, payload["sub"], claim):
+                return claim["r"]
+            return await self.get_role_names(payload["sub"])
+
+        return await self.get_roles_current_user(access_token)
 
     async def assign_user_to_role(self, user_id: UUID, role_id: UUID, access_token: str):
         with tracer.start_as_current_span("assign_user_to_role"):
@@ -62,9 +80,11 @@ class UserRoleService:
 
             with tracer.start_as_current_span("add_user_to_role_commit"):
                 user_roles = UserRole(user=user, role=role)
-                self.db_session.add(user_roles)
-                await self.db_session.commit()
+                async with permission_versions.changing(self.cache, str(user_id)):
+                    self.db_session.add(user_roles)
+                    await self.db_session.commit()
 
+            await user_profiles.invalidate(self.cache, str(user_id))
             return user_roles
 
     async def remove_role_from_user(self, user_id: UUID, role_id: UUID, access_token: str):
@@ -90,9 +110,11 @@ class UserRoleService:
                 raise EntityNotFoundException
 
             with tracer.start_as_current_span("delete_user_roles_commit"):
-                await self.db_session.delete(user_roles)
-                await self.db_session.commit()
+                async with permission_versions.changing(self.cache, str(user_id)):
+                    await self.db_session.delete(user_roles)
+                    await self.db_session.commit()
 
+            await user_profiles.invalidate(self.cache, str(user_id))
             return user_roles
 
     async def check_user_permissions(self, user_id: UUID, access_token: str) -> dict[list[str], list[str]]:
@@ -135,7 +157,7 @@ def roles_required(required_role: str):
         async def wrapper(*args, **kwargs):
             user_role_service: UserRoleService = kwargs.get("user_role_service")
             auth_credentials = kwargs.get("auth_credentials")
-            roles = await user_role_service.get_roles_current_user(auth_credentials.credentials)
+            roles = await user_role_service.get_roles_for_authorization(auth_credentials.credentials)
             if required_role not in roles:
                 raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="FORBIDDEN")
             return await function(*args, **kwargs)
@@ -2,7 +2,6 @@ from sqlalchemy import select, and_
 from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
-from werkzeug.security import generate_password_hash
 from opentelemetry import trace
 
 from api.v1.auth.schemas import UserLogin, UserCreate
@@ -10,6 +9,7 @@ from exceptions.exceptions import AuthorizationException, DuplicateEntityExcepti
 from models.user import AuthHistory, AuthSessions, User, SocialAccount
 from models.utils import SocialAccountSchema
 from models.role import Role, Permission, UserRole
+from services.password_hasher import hash_password, needs_rehash, verify_password
 
 tracer = trace.get_tracer(__name__)
 
@@ -23,7 +23,7 @@ class UserService:
             if await self._get_user_by_username(user_dto.username):
                 raise DuplicateEntityException
 
-            user = User(**user_dto.model_dump())
+            user = User(**user_dto.model_dump(), password_hash=await hash_password(user_dto.password))
 
             self.session.add(user)
             await self.session.commit()
@@ -50,7 +50,7 @@ class UserService:
     async def reset_password(self, user_id: str, new_password: str):
         with tracer.start_as_current_span("UserService.reset_password"):
             user = await self._get_user_by_id(user_id)
-            setattr(user, "password", generate_password_hash(new_password))
+            setattr(user, "password", await hash_password(new_password))
             await self.session.commit()
 
     async def get_login_history(self, user_id: str) -> list[dict]:
@@ -91,9 +91,13 @@ class UserService:
             if not user:
                 raise EntityNotFoundException
 
-            if not await user.check_password(user_dto.password):
+            if not await verify_password(user.password, user_dto.password):
                 raise AuthorizationException
 
+            if needs_rehash(user.password):
+                user.password = await hash_password(user_dto.password)
+                await self.session.commit()
+
             return user
 
     async def check_social_accounts(self, social_name: str, social_id: str):
@@ -140,6 +144,19 @@ class UserService:
         except NoResultFound:
             raise EntityNotFoundException
 
+    async def get_user_access(self, user_id: str) -> dict:
+        with tracer.start_as_current_span("UserService.get_user_access"):
+            user = await self.session.scalar(
+                select(User)
+                .options(joinedload(User.user_roles).joinedload(UserRole.role).joinedload(Role.permissions))
+                .where(User.id == user_id)
+            )
+            if not user:
+                raise EntityNotFoundException
+
+            permission_names = {permission.name for item in user.user_roles for permission in item.role.permissions}
+            return {"roles": [item.role.name for item in user.user_roles], "permissions": sorted(permission_names)}
+
     async def get_all_users(self, user_id: str) -> dict:
         try:
             users = await self.session.scalars(select(User).limit(10).where(User.id != user_id))
@@ -0,0 +1,61 @@
+"""Measures TokenUtil.validate_token with and without the decoded payload cache.
+
+Revocation lookups are answered by a synced in-memory denylist, so the numbers
+show the decode cost alone:
+
+    python -m tests.benchmarks.token_decode --tokens 100 --rounds 100
+"""
+
+import json
+import time
+import asyncio
+import argparse
+from datetime import timedelta
+
+from services.token_cache import decoded_tokens
+from services.token_denylist import token_denylist
+from services.token_utils import TokenUtil
+
+
+class NoCache:
+    async def get(self, key: str, **kwargs):
+        return None
+
+
+async def measure(token_util: TokenUtil, tokens: list[str], rounds: int, cached: bool) -> float:
+    decoded_tokens.clear()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if not cached:
+            decoded_tokens.clear()
+        for token in tokens:
+            assert await token_util.validate_access_token(token) is not None
+    return (time.perf_counter() - started) / (rounds * len(tokens))
+
+
+async def run_benchmark(tokens: int, rounds: int) -> dict:
+    token_util = TokenUtil(NoCache())
+    token_denylist.synced = True
+    issued = [
+        token_util.create_token({"sub": str(index)}, TokenUtil.TOKEN_TYPE_ACCESS, timedelta(minutes=10))
+        for index in range(tokens)
+    ]
+
+    uncached = await measure(token_util, issued, rounds, cached=False)
+    cached = await measure(token_util, issued, rounds, cached=True)
+    return {
+        "tokens": tokens,
+        "rounds": rounds,
+        "uncached_us": uncached * 1_000_000,
+        "cached_us": cached * 1_000_000,
+        "speedup": uncached / cached,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="validate_token decode cost with and without the payload cache")
+    parser.add_argument("--tokens", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=100)
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(run_benchmark(args.tokens, args.rounds)), indent=2))
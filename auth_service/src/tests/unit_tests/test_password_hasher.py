@@ -0,0 +1,16 @@
+from services.password_hasher import close_password_pool, hash_password, needs_rehash, verify_password
+
+
+async def test_pool_hashes_and_verifies_passwords():
+    try:
+        password_hash = await hash_password("user_password")
+
+        assert await verify_password(password_hash, "user_password")
+        assert not await verify_password(password_hash, "other_password")
+    finally:
+        close_password_pool()
+
+
+def test_hashes_of_other_methods_need_rehash():
+    assert needs_rehash("pbkdf2:sha256:600000$salt$hash")
+    assert not needs_rehash("scrypt:32768:8:1$salt$hash")
@@ -0,0 +1,88 @@
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import ConnectionError
+
+from core.config import settings
+from services.auth_service import AuthService
+from services.permission_snapshot import ACCESS_CLAIM, build_access_claim, permission_versions
+from services.token_utils import TokenUtil
+from services.user_roles_service import UserRoleService
+from tests.utils import FakeCache
+
+
+async def test_stale_permission_claim_falls_back_to_db(monkeypatch):
+    monkeypatch.setattr(settings, "token_permission_claims", True)
+    cache = FakeCache()
+    service = UserRoleService(cache, db_session=None)
+    db_lookups = []
+
+    async def get_role_names(user_id):
+        db_lookups.append(user_id)
+        return ["admin"]
+
+    monkeypatch.setattr(service, "get_role_names", get_role_names)
+    version = await permission_versions.get(cache, "user_id")
+    token = service.token_util.create_token(
+        {"sub": "user_id", ACCESS_CLAIM: build_access_claim(["user"], [], version)}, TokenUtil.TOKEN_TYPE_ACCESS
+    )
+
+    assert await service.get_roles_for_authorization(token) == ["user"]
+    assert db_lookups == []
+
+    await permission_versions.bump(cache, "user_id")
+
+    assert await service.get_roles_for_authorization(token) == ["admin"]
+    assert db_lookups == ["user_id"]
+
+
+async def test_versions_of_role_holders_are_bumped_in_one_round_trip():
+    class CountingCache(FakeCache):
+        round_trips = 0
+
+        async def incr_many(self, keys, exp=None):
+            self.round_trips += 1
+            return await super().incr_many(keys, exp)
+
+    cache = CountingCache()
+
+    await permission_versions.bump(cache, "first_id", "second_id")
+
+    assert cache.round_trips == 1
+    assert await permission_versions.get(cache, "first_id") == await permission_versions.get(cache, "second_id") == 1
+
+
+async def test_token_is_issued_without_claim_while_redis_is_unavailable(monkeypatch):
+    monkeypatch.setattr(settings, "token_permission_claims", True)
+
+    class UnavailableCache(FakeCache):
+        async def get(self, key, **kwargs):
+            raise ConnectionError
+
+    service = AuthService(UnavailableCache(), session=None)
+
+    assert await service._build_base_payload("unknown_id") == {"sub": "unknown_id"}
+
+
+async def test_role_change_is_not_committed_while_versions_cannot_be_bumped(monkeypatch):
+    monkeypatch.setattr(settings, "token_permission_claims", True)
+
+    class UnavailableCache(FakeCache):
+        async def incr_many(self, keys, exp=None):
+            raise ConnectionError
+
+    commits = []
+    with pytest.raises(HTTPException):
+        async with permission_versions.changing(UnavailableCache(), "user_id"):
+            commits.append("user_id")
+
+    assert commits == []
+
+
+async def test_role_change_leaves_versions_alone_without_permission_claims(monkeypatch):
+    monkeypatch.setattr(settings, "token_permission_claims", False)
+    cache = FakeCache()
+
+    async with permission_versions.changing(cache, "user_id"):
+        pass
+
+    assert cache.data == {}
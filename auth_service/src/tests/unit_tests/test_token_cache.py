@@ -0,0 +1,35 @@
+import time
+
+from core.config import settings
+from services.token_cache import DecodedTokenCache, get_token_digest
+
+
+def test_decoded_payload_expires_with_token():
+    decoded_tokens = DecodedTokenCache(max_size=settings.decoded_tokens_cache_size)
+    fresh, stale = get_token_digest("fresh"), get_token_digest("stale")
+    decoded_tokens.set(fresh, {"sub": "user_id", "exp": time.time() + 60})
+    decoded_tokens.set(stale, {"sub": "user_id", "exp": time.time() - 1})
+
+    assert decoded_tokens.get(fresh)["sub"] == "user_id"
+    assert decoded_tokens.get(stale) is None
+    assert stale not in decoded_tokens.entries
+
+
+def test_decoded_payload_cache_is_bounded():
+    decoded_tokens = DecodedTokenCache(max_size=2)
+    for token in ("first", "second", "third"):
+        decoded_tokens.set(get_token_digest(token), {"exp": time.time() + 60})
+
+    assert decoded_tokens.get(get_token_digest("first")) is None
+    assert len(decoded_tokens.entries) == 2
+
+
+def test_decoded_payload_is_not_shared_with_callers():
+    decoded_tokens = DecodedTokenCache(max_size=2)
+    digest = get_token_digest("token")
+    payload = {"sub": "user_id", "exp": time.time() + 60, "acl": {"r": ["user"]}}
+    decoded_tokens.set(digest, payload)
+    payload["acl"]["r"].append("admin")
+    decoded_tokens.get(digest)["sub"] = "other_id"
+
+    assert decoded_tokens.get(digest) == {"sub": "user_id", "exp": payload["exp"], "acl": {"r": ["user"]}}
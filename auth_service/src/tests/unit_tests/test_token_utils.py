@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from jose import jwt
+
+from core.config import settings
+from services.token_denylist import REVOKED_PREFIX, token_denylist
+from services.token_utils import TokenUtil
+from tests.utils import FakeCache
+
+
+async def test_revoked_jti_is_rejected_until_token_expiry():
+    cache = FakeCache()
+    token_util = TokenUtil(cache)
+    token = token_util.create_token({"sub": "user_id"}, TokenUtil.TOKEN_TYPE_ACCESS)
+    payload = await token_util.validate_access_token(token)
+
+    await token_util.revoke_token(token)
+
+    assert await token_util.validate_access_token(token) is None
+    assert cache.data[REVOKED_PREFIX + payload["jti"]] == str(payload["exp"])
+    assert 0 < cache.ttls[REVOKED_PREFIX + payload["jti"]] <= timedelta(minutes=10).total_seconds() + 1
+
+
+async def test_expired_token_needs_no_revocation_entry():
+    cache = FakeCache()
+    token_util = TokenUtil(cache)
+    token = token_util.create_token({"sub": "user_id"}, TokenUtil.TOKEN_TYPE_ACCESS, timedelta(minutes=-1))
+
+    await token_util.revoke_token(token)
+
+    assert cache.data == {}
+
+
+async def test_token_revoked_by_full_token_key_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "legacy_revocation_check", True)
+    cache = FakeCache()
+    token_util = TokenUtil(cache)
+    token = token_util.create_token({"sub": "user_id"}, TokenUtil.TOKEN_TYPE_ACCESS)
+    await cache.set(key=token, data=token, exp=timedelta(minutes=60))
+
+    assert await token_util.validate_access_token(token) is None
+
+
+async def test_token_without_jti_is_rejected():
+    token_util = TokenUtil(FakeCache())
+    exp = datetime.utcnow() + timedelta(minutes=10)
+    token = jwt.encode(
+        {"sub": "user_id", "type": TokenUtil.TOKEN_TYPE_ACCESS, "exp": exp},
+        key=settings.auth_jwt_key,
+        algorithm=settings.jwt_algorithm,
+    )
+
+    assert await token_util.validate_access_token(token) is None
+    await token_util.revoke_token(token)
+
+
+async def test_valid_token_is_checked_without_redis_once_denylist_is_synced(monkeypatch):
+    class CountingCache(FakeCache):
+        lookups = 0
+
+        async def get(self, key, **kwargs):
+            self.lookups += 1
+            return await super().get(key, **kwargs)
+
+    monkeypatch.setattr(token_denylist, "synced", True)
+    cache = CountingCache()
+    token_util = TokenUtil(cache)
+    token = token_util.create_token({"sub": "user_id"}, TokenUtil.TOKEN_TYPE_ACCESS)
+
+    assert await token_util.validate_access_token(token) is not None
+    assert cache.lookups == 0
@@ -0,0 +1,65 @@
+from redis.exceptions import ConnectionError
+
+from services.user_profile_cache import PROFILE_CHANNEL, PROFILE_PREFIX, UserProfileCache
+from tests.utils import FakeCache
+
+
+async def test_profile_is_reloaded_after_invalidation():
+    cache = FakeCache()
+    profiles = UserProfileCache(ttl=300, local_ttl=30, local_size=10)
+    loads = []
+
+    async def loader():
+        loads.append("user_id")
+        return {"id": "user_id", "roles": ["user"]}
+
+    await profiles.get_or_load(cache, "user_id", loader)
+    await profiles.get_or_load(cache, "user_id", loader)
+    await profiles.invalidate(cache, "user_id")
+
+    assert PROFILE_PREFIX + "user_id" not in cache.data
+    assert (PROFILE_CHANNEL, "user_id") in cache.published
+    assert await profiles.get_or_load(cache, "user_id", loader) == {"id": "user_id", "roles": ["user"]}
+    assert len(loads) == 2
+
+
+async def test_profile_loaded_across_invalidation_is_not_cached():
+    cache = FakeCache()
+    profiles = UserProfileCache(ttl=300, local_ttl=30, local_size=10)
+
+    async def loader():
+        # The role change commits and invalidates while the old profile is being read
+        await profiles.invalidate(cache, "user_id")
+        return {"id": "user_id", "roles": ["user"]}
+
+    await profiles.get_or_load(cache, "user_id", loader)
+
+    assert PROFILE_PREFIX + "user_id" not in cache.data
+    assert profiles.get_local("user_id") is None
+
+
+async def test_profile_invalidation_survives_redis_outage():
+    class UnavailableCache(FakeCache):
+        async def incr_many(self, keys, exp=None):
+            raise ConnectionError
+
+    cache = UnavailableCache()
+    profiles = UserProfileCache(ttl=300, local_ttl=30, local_size=10)
+    profiles.set_local("user_id", {"id": "user_id"})
+
+    await profiles.invalidate(cache, "user_id")
+
+    assert profiles.get_local("user_id") is None
+
+
+async def test_local_profile_is_not_shared_with_callers():
+    cache = FakeCache()
+    profiles = UserProfileCache(ttl=300, local_ttl=30, local_size=10)
+
+    async def loader():
+        return {"id": "user_id", "roles": ["user"]}
+
+    profile = await profiles.get_or_load(cache, "user_id", loader)
+    profile["roles"].append("admin")
+
+    assert await profiles.get_or_load(cache, "user_id", loader) == {"id": "user_id", "roles": ["user"]}
@@ -1,8 +1,11 @@
+from fnmatch import fnmatch
+from datetime import timedelta
 from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from models.user import User
+from db.cache.abstract_cache import AbstractCacheStorage
 
 
 @asynccontextmanager
@@ -14,3 +17,56 @@ async def create_user_cm(session: AsyncSession, **kwargs) -> User:
     yield u
     await session.delete(u)
     await session.commit()
+
+
+class FakeCache(AbstractCacheStorage):
+    """In-memory cache storage, keeps the requested TTLs and published messages for assertions."""
+
+    def __init__(self):
+        self.data: dict[str, str] = {}
+        self.ttls: dict[str, int] = {}
+        self.published: list[tuple[str, str]] = []
+
+    async def get(self, key: str, **kwargs):
+        return self.data.get(key)
+
+    async def set(self, key: str, data: str, exp: timedelta | int, **kwargs):
+        self.data[key] = data
+        self.ttls[key] = exp
+
+    async def incr(self, key: str) -> int:
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    async def incr_many(self, keys: list[str], exp: timedelta | int | None = None) -> list[int]:
+        return [await self.incr(key) for key in keys]
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def mget(self, keys: list[str]) -> list:
+        return [self.data.get(key) for key in keys]
+
+    async def scan_keys(self, pattern: str) -> list[str]:
+        return [key for key in self.data if fnmatch(key, pattern)]
+
+    async def publish(self, channel: str, data: str):
+        self.published.append((channel, data))
+
+    def pubsub(self):
+        return FakePubSub()
+
+
+class FakePubSub:
+    """Pub/sub without deliveries, the listener ends at once."""
+
+    async def subscribe(self, *channels: str):
+        pass
+
+    async def listen(self):
+        return
+        yield
+
+    async def reset(self):
+        pass
@@ -5,6 +5,11 @@ import { useNavigate, useSearchParams } from "react-router-dom";
 import Header from "../header/Header";
 import Chat from "./chat/Chat";
 import VideoPlayer from "./video_player/VideoPlayer";
+import { commandSubprotocol, isCommandFrame, decodeCommand } from "./commandProtocol";
+
+const frameDecoder = new TextDecoder("utf-8");
+// Ticks closer than this to the local position are ignored to avoid visible jumps
+const maxDriftSeconds = 0.5;
 
 function SessionPage(props) {
     const [preventEvents, setPreventEvents] = useState(false);
@@ -21,16 +26,47 @@ function SessionPage(props) {
             navigate("/login");
         } else {
             if (!ws) {
-                const ws = new WebSocket("ws://localhost:8090/api/v1/session/ws/join_session/" + sessionId);
+                const ws = new WebSocket("ws://localhost:8090/api/v1/session/ws/join_session/" + sessionId, [commandSubprotocol]);
+                // Server pushes pre-encoded UTF-8 JSON frames and, once the subprotocol is agreed, binary command frames
+                ws.binaryType = "arraybuffer";
 
                 ws.onmessage = (messageData) => {
                     console.log(messageData);
                     try {
-                        const message = JSON.parse(messageData.data);
+                        let message;
+                        if (typeof messageData.data === "string") {
+                            message = JSON.parse(messageData.data);
+                        } else if (isCommandFrame(messageData.data)) {
+                            message = decodeCommand(messageData.data);
+                        } else {
+                            message = JSON.parse(frameDecoder.decode(messageData.data));
+                        }
                         console.log("Received message:", message);
 
                         if (message.type === "message") {
                             setMessages(prevMessages => [...prevMessages, message]);
+                        } else if (message.type === "snapshot") {
+                            if (message.state) {
+                                const videoPlayerCmp = document.getElementById("video-player");
+
+                                setPreventEvents(true);
+                                videoPlayerCmp.currentTime = message.state.timestamp;
+                                if (message.state.commandType === "play") {
+                                    videoPlayerCmp.play();
+                                } else {
+                                    videoPlayerCmp.pause();
+                                }
+                            }
+                            setMessages(prevMessages => [...prevMessages, ...message.messages]);
+                        } else if (message.type === "ping") {
+                            ws.send(JSON.stringify({ type: "pong" }));
+                        } else if (message.type === "tick") {
+                            const videoPlayerCmp = document.getElementById("video-player");
+
+                            if (!videoPlayerCmp.paused && Math.abs(videoPlayerCmp.currentTime - message.timestamp) > maxDriftSeconds) {
+                                setPreventEvents(true);
+                                videoPlayerCmp.currentTime = message.timestamp;
+                            }
                         } else if (message.type === "command") {
                             if (message.userId !== props.userId) {
                                 const videoPlayerCmp = document.getElementById("video-player");
@@ -0,0 +1,51 @@
+// Binary framing of playback commands, mirrors watch_together/app/services/command_protocol.py
+// frame type (uint8) | command code (uint8) | timestamp (float64, big endian) | user id (UTF-8)
+export const commandSubprotocol = "watch-together.commands.v1";
+
+const frameCommand = 1;
+const headerSize = 10;
+const commandCodes = { play: 1, pause: 2, seeked: 3 };
+const commandTypes = { 1: "play", 2: "pause", 3: "seeked" };
+
+const textEncoder = new TextEncoder();
+const textDecoder = new TextDecoder("utf-8");
+
+export function isCommandFrame(buffer) {
+    return buffer.byteLength >= headerSize && new DataView(buffer).getUint8(0) === frameCommand;
+}
+
+export function encodeCommand(commandType, timestamp, userId) {
+    const userIdBytes = textEncoder.encode(userId);
+    const frame = new Uint8Array(headerSize + userIdBytes.length);
+    const view = new DataView(frame.buffer);
+    view.setUint8(0, frameCommand);
+    view.setUint8(1, commandCodes[commandType]);
+    view.setFloat64(2, timestamp);
+    frame.set(userIdBytes, headerSize);
+    return frame.buffer;
+}
+
+export function decodeCommand(buffer) {
+    const view = new DataView(buffer);
+    return {
+        type: "command",
+        commandType: commandTypes[view.getUint8(1)],
+        timestamp: view.getFloat64(2),
+        userId: textDecoder.decode(new Uint8Array(buffer, headerSize))
+    };
+}
+
+export function sendCommand(ws, userId, commandType, timestamp) {
+    if (ws.protocol === commandSubprotocol) {
+        ws.send(encodeCommand(commandType, timestamp, userId));
+    } else {
+        ws.send(
+            JSON.stringify({
+                userId: userId,
+                type: "command",
+                commandType: commandType,
+                timestamp: timestamp
+            })
+        );
+    }
+}
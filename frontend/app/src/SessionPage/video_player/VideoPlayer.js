@@ -1,5 +1,6 @@
 import React from "react";
 import posterImage from "./media/poster.jpg";
+import { sendCommand } from "../commandProtocol";
 
 function VideoPlayer(props) {
     const handlePlay = () => {
@@ -9,14 +10,7 @@ function VideoPlayer(props) {
         }
 
         const video = document.getElementById("video-player");
-        props.ws.send(
-            JSON.stringify({
-                userId: props.userId,
-                type: "command",
-                commandType: "play",
-                timestamp: video.currentTime
-            })
-        );
+        sendCommand(props.ws, props.userId, "play", video.currentTime);
     };
 
     const handlePause = () => {
@@ -26,14 +20,7 @@ function VideoPlayer(props) {
         }
 
         const video = document.getElementById("video-player");
-        props.ws.send(
-            JSON.stringify({
-                userId: props.userId,
-                type: "command",
-                commandType: "pause",
-                timestamp: video.currentTime
-            })
-        );
+        sendCommand(props.ws, props.userId, "pause", video.currentTime);
     };
 
     const handleSeeked = () => {
@@ -43,14 +30,7 @@ function VideoPlayer(props) {
         }
 
         const video = document.getElementById("video-player");
-        props.ws.send(
-            JSON.stringify({
-                userId: props.userId,
-                type: "command",
-                commandType: "seeked",
-                timestamp: video.currentTime
-            })
-        );
+        sendCommand(props.ws, props.userId, "seeked", video.currentTime);
     };
 
     return (
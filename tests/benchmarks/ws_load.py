@@ -0,0 +1,209 @@
+"""Load generator for the join_session websocket.
+
+Simulates N rooms with M viewers each against fakeredis and mongomock and
+prints a JSON report with join latency, command fan-out latency and delivered
+messages per second. The app is served by an in-process uvicorn, because
+ASGIWebSocketTransport runs every socket in its own thread and event loop,
+while rooms share state between sockets:
+
+    python -m tests.benchmarks.ws_load --rooms 5 --viewers 20 --commands 50 --output report.json
+
+With --binary the clients negotiate the binary command subprotocol.
+
+The stand-ins come from fakeredis and mongomock-motor in the test dependency group,
+install them with `poetry install --with test` before `make local_benchmark`.
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import importlib
+import statistics
+
+import httpx
+import orjson
+import uvicorn
+from fakeredis.aioredis import FakeRedis
+from httpx_ws import aconnect_ws
+from mongomock_motor import AsyncMongoMockClient
+
+from watch_together.app.config import settings
+from watch_together.app.db import mongo
+from watch_together.app.main import build_app
+from watch_together.app.services.broadcast import BroadcastEngine
+from watch_together.app.services.command_protocol import SUBPROTOCOL, FRAME_COMMAND, decode_command, encode_command
+from watch_together.app.services.websocket import ConnectionManager
+from watch_together.app.db.cache.redis_cache import RedisCacheStorage
+from watch_together.app.utils.auth_util import get_current_user, get_user_friends
+
+from tests.utils.users import get_user_test, get_user_friends_test
+
+# The sessions package re-exports the APIRouter under the module name
+router_module = importlib.import_module("watch_together.app.api.v1.sessions.router")
+
+API_PREFIX = "/api/v1/session"
+
+
+def build_bench_app():
+    # Commands are not throttled here, the point is to measure raw fan-out
+    settings.command_rate_per_user = 1_000_000
+    settings.command_burst_per_user = 1_000_000
+
+    mongo.mongo_client = mongo.MongoClient(settings)
+    mongo.mongo_client.engine = AsyncMongoMockClient()
+    router_module.manager = ConnectionManager(
+        RedisCacheStorage(FakeRedis()),
+        BroadcastEngine(settings.broadcast_queue_size, settings.broadcast_send_timeout),
+    )
+
+    app = build_app()
+    app.dependency_overrides[get_current_user] = get_user_test
+    app.dependency_overrides[get_user_friends] = get_user_friends_test
+    return app
+
+
+def percentile(values: list[float], share: float) -> float | None:
+    if not values:
+        return None
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(share * 100) - 1]
+
+
+def summarize(values: list[float]) -> dict:
+    return {
+        "count": len(values),
+        "p50_ms": percentile([value * 1000 for value in values], 0.5),
+        "p99_ms": percentile([value * 1000 for value in values], 0.99),
+    }
+
+
+async def receive_frame(ws, frame_type: str, timeout: float) -> dict:
+    while True:
+        raw = await ws.receive_bytes(timeout=timeout)
+        frame = decode_command(raw) if raw[0] == FRAME_COMMAND else orjson.loads(raw)
+        if frame["type"] == frame_type:
+            return frame
+
+
+def connect(client, session_id, binary: bool):
+    subprotocols = [SUBPROTOCOL] if binary else None
+    return aconnect_ws(f"{API_PREFIX}/ws/join_session/{session_id}", client, subprotocols=subprotocols)
+
+
+async def serve(app, port: int) -> tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+async def run_viewer(
+    client, session_id, sent_at, commands, join_latencies, fanout_latencies, ready, start, timeout, binary
+):
+    started = time.perf_counter()
+    async with connect(client, session_id, binary) as ws:
+        await receive_frame(ws, "snapshot", timeout)
+        join_latencies.append(time.perf_counter() - started)
+        ready.release()
+        await start.wait()
+        for _ in range(commands):
+            frame = await receive_frame(ws, "command", timeout)
+            fanout_latencies.append(time.perf_counter() - sent_at[int(frame["timestamp"])])
+
+
+async def run_room(base_url, viewers, commands, join_latencies, fanout_latencies, timeout, binary):
+    sent_at: dict[int, float] = {}
+    ready = asyncio.Semaphore(0)
+    start = asyncio.Event()
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post(f"{API_PREFIX}/create_session", json={"movie_id": "benchmark"})
+        session_id = response.json()["session_id"]
+        tasks = [
+            asyncio.create_task(
+                run_viewer(
+                    client,
+                    session_id,
+                    sent_at,
+                    commands,
+                    join_latencies,
+                    fanout_latencies,
+                    ready,
+                    start,
+                    timeout,
+                    binary,
+                )
+            )
+            for _ in range(viewers)
+        ]
+        for _ in range(viewers):
+            await ready.acquire()
+
+        async with connect(client, session_id, binary) as sender:
+            await receive_frame(sender, "snapshot", timeout)
+            start.set()
+            for index in range(commands):
+                sent_at[index] = time.perf_counter()
+                command_type = "play" if index % 2 else "pause"
+                if binary:
+                    await sender.send_bytes(encode_command(command_type, index, "1"))
+                else:
+                    await sender.send_text(
+                        json.dumps({"userId": "1", "type": "command", "commandType": command_type, "timestamp": index})
+                    )
+                await receive_frame(sender, "command", timeout)
+            await asyncio.gather(*tasks)
+
+
+async def run_benchmark(rooms: int, viewers: int, commands: int, timeout: float, port: int, binary: bool) -> dict:
+    app = build_bench_app()
+    join_latencies: list[float] = []
+    fanout_latencies: list[float] = []
+
+    server, server_task = await serve(app, port)
+    try:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[
+                run_room(
+                    f"http://127.0.0.1:{port}", viewers, commands, join_latencies, fanout_latencies, timeout, binary
+                )
+                for _ in range(rooms)
+            ]
+        )
+        duration = time.perf_counter() - started
+    finally:
+        server.should_exit = True
+        await server_task
+
+    return {
+        "rooms": rooms,
+        "viewers_per_room": viewers,
+        "commands_per_room": commands,
+        "binary_commands": binary,
+        "duration_s": duration,
+        "join_latency": summarize(join_latencies),
+        "fanout_latency": summarize(fanout_latencies),
+        "messages_per_second": len(fanout_latencies) / duration,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Websocket load test for watch_together rooms")
+    parser.add_argument("--rooms", type=int, default=5)
+    parser.add_argument("--viewers", type=int, default=20)
+    parser.add_argument("--commands", type=int, default=50)
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for a single frame")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--binary", action="store_true", help="Negotiate the binary command subprotocol")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.rooms, args.viewers, args.commands, args.timeout, args.port, args.binary))
+    if args.output:
+        with open(args.output, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
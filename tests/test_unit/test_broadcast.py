@@ -0,0 +1,102 @@
+import asyncio
+
+from watch_together.app.models import Session
+from watch_together.app.services.broadcast import BroadcastEngine, encode_frame
+from tests.utils.websockets import FakeWebSocket
+
+
+async def test_broadcast_not_blocked_by_slow_client():
+    engine = BroadcastEngine(queue_size=8, send_timeout=0.05)
+    session = Session()
+    fast, slow = FakeWebSocket(), FakeWebSocket(delay=1)
+    engine.register(session, fast)
+    engine.register(session, slow)
+
+    await engine.broadcast("play", session)
+    await asyncio.sleep(0.1)
+
+    assert fast.received == ["play"]
+    assert slow.closed
+    assert session.clients == [fast]
+    await engine.close()
+
+
+async def test_queue_overflow_evicts_client():
+    engine = BroadcastEngine(queue_size=1, send_timeout=1)
+    session = Session()
+    websocket = FakeWebSocket(delay=0.5)
+    engine.register(session, websocket)
+
+    for _ in range(3):
+        await engine.broadcast("seeked", session)
+    await engine.close()
+
+    assert websocket.closed
+    assert session.clients == []
+
+
+async def test_encoded_frame_is_shared_between_clients():
+    engine = BroadcastEngine(queue_size=8, send_timeout=1)
+    session = Session()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    engine.register(session, first)
+    engine.register(session, second)
+
+    frame = encode_frame({"type": "command", "commandType": "pause", "timestamp": 1.5})
+    await engine.broadcast(frame, session)
+    await asyncio.sleep(0.05)
+
+    assert first.received[0] is frame
+    assert second.received[0] is frame
+    await engine.close()
+
+
+async def test_binary_clients_get_binary_frames():
+    engine = BroadcastEngine(queue_size=8, send_timeout=0.05)
+    session = Session()
+    json_client, binary_client = FakeWebSocket(), FakeWebSocket()
+    engine.register(session, json_client)
+    engine.register(session, binary_client, binary=True)
+
+    await engine.broadcast(b'{"type":"command"}', session, b"\x01\x01")
+    await asyncio.sleep(0.05)
+
+    assert json_client.received == [b'{"type":"command"}']
+    assert binary_client.received == [b"\x01\x01"]
+    await engine.close()
+
+
+async def test_evicted_client_is_closed_once_with_code():
+    engine = BroadcastEngine(queue_size=8, send_timeout=1)
+    session = Session()
+    websocket = FakeWebSocket()
+    engine.register(session, websocket)
+
+    await engine.evict(session, websocket, 1013)
+    await engine.close()
+    websocket.closed = False
+    await engine.evict(session, websocket, 1000)
+    await engine.close()
+
+    assert not websocket.closed
+    assert websocket.close_code == 1013
+
+
+async def test_hanging_close_does_not_block_the_room():
+    class HangingWebSocket(FakeWebSocket):
+        async def close(self, code=1000):
+            await asyncio.sleep(10)
+
+    engine = BroadcastEngine(queue_size=1, send_timeout=0.05)
+    session = Session()
+    stuck, healthy = HangingWebSocket(delay=10), FakeWebSocket()
+    engine.register(session, stuck)
+    engine.register(session, healthy)
+
+    for timestamp in range(3):
+        await asyncio.wait_for(engine.broadcast(f"seeked {timestamp}", session), timeout=0.01)
+    await asyncio.sleep(0.01)
+
+    assert session.clients == [healthy]
+    assert healthy.received == ["seeked 0", "seeked 1", "seeked 2"]
+    await engine.close()
@@ -0,0 +1,112 @@
+import asyncio
+
+from watch_together.app.models import Session
+from watch_together.app.services.command_coalescer import CommandCoalescer
+from watch_together.app.services.room_dispatcher import RoomDispatcher
+
+
+def seek(timestamp: float) -> dict:
+    return {"userId": "1", "type": "command", "commandType": "seeked", "timestamp": timestamp}
+
+
+def make_coalescer(handler, session: Session, rejected=None, **kwargs) -> tuple[CommandCoalescer, RoomDispatcher]:
+    async def on_rejected(data, session, websocket):
+        if rejected is not None:
+            rejected.append(data)
+
+    dispatcher = RoomDispatcher(None, inbox_size=32, put_timeout=0.1)
+    coalescer = CommandCoalescer(handler, on_rejected, dispatcher.post, **kwargs)
+    dispatcher.handler = coalescer.submit
+    dispatcher.open(session, None)
+    return coalescer, dispatcher
+
+
+async def test_seek_storm_is_collapsed_to_latest():
+    delivered = []
+
+    async def handler(data, session, websocket):
+        delivered.append(data["timestamp"])
+
+    session = Session()
+    coalescer, dispatcher = make_coalescer(handler, session, window=0.05, rate=1000, burst=1000)
+    for timestamp in range(10):
+        await coalescer.submit(seek(timestamp), session, None)
+    await asyncio.sleep(0.15)
+
+    assert delivered == [0, 9]
+
+
+async def test_play_flushes_pending_seek_first():
+    delivered = []
+
+    async def handler(data, session, websocket):
+        delivered.append(data["commandType"])
+
+    session = Session()
+    coalescer, dispatcher = make_coalescer(handler, session, window=10, rate=1000, burst=1000)
+    await coalescer.submit(seek(1), session, None)
+    await coalescer.submit(seek(2), session, None)
+    await coalescer.submit({"userId": "1", "type": "command", "commandType": "play", "timestamp": 2}, session, None)
+    coalescer.forget_room(session)
+
+    assert delivered == ["seeked", "seeked", "play"]
+
+
+async def test_user_rate_limit():
+    delivered = []
+
+    async def handler(data, session, websocket):
+        delivered.append(data)
+
+    rejected = []
+    session = Session()
+    coalescer, dispatcher = make_coalescer(handler, session, rejected, window=0.05, rate=0.001, burst=2)
+    pause = {"userId": "1", "type": "command", "commandType": "pause", "timestamp": 0}
+    for _ in range(5):
+        await coalescer.submit(pause, session, None)
+
+    assert len(delivered) == 2
+    assert len(rejected) == 3
+
+
+async def test_seek_burst_beyond_rate_limit_delivers_last_position():
+    delivered = []
+
+    async def handler(data, session, websocket):
+        delivered.append(data["timestamp"])
+
+    session = Session()
+    coalescer, dispatcher = make_coalescer(handler, session, window=0.05, rate=0.001, burst=2)
+    for timestamp in range(10):
+        await coalescer.submit(seek(timestamp), session, None)
+    await asyncio.sleep(0.15)
+
+    assert delivered == [0, 9]
+
+
+async def test_window_flush_runs_in_room_order():
+    events = []
+
+    async def handler(data, session, websocket):
+        events.append(("start", data["commandType"]))
+        await asyncio.sleep(data.get("delay", 0))
+        events.append(("end", data["commandType"]))
+
+    session = Session()
+    coalescer, dispatcher = make_coalescer(handler, session, window=0.02, rate=1000, burst=1000)
+    await dispatcher.submit(seek(1), session, None)
+    await dispatcher.submit({**seek(2), "delay": 0.05}, session, None)
+    # The play arrives while the coalesced seek is being delivered
+    await asyncio.sleep(0.04)
+    await dispatcher.submit({"userId": "1", "type": "command", "commandType": "play", "timestamp": 2}, session, None)
+    await asyncio.sleep(0.1)
+
+    assert events == [
+        ("start", "seeked"),
+        ("end", "seeked"),
+        ("start", "seeked"),
+        ("end", "seeked"),
+        ("start", "play"),
+        ("end", "play"),
+    ]
+    await dispatcher.stop()
@@ -0,0 +1,24 @@
+import orjson
+import pytest
+
+from watch_together.app.services.command_protocol import command_frame_from_json, decode_command, encode_command
+
+
+def test_command_round_trip():
+    frame = encode_command("seeked", 42.5, "user-1")
+
+    assert len(frame) == 16
+    assert decode_command(frame) == {"type": "command", "commandType": "seeked", "timestamp": 42.5, "userId": "user-1"}
+
+
+def test_relayed_json_command_is_reencoded():
+    json_frame = orjson.dumps({"userId": "1", "type": "command", "commandType": "play", "timestamp": 3})
+
+    assert decode_command(command_frame_from_json(json_frame))["commandType"] == "play"
+    assert command_frame_from_json(b'{"type":"message"}') is None
+
+
+@pytest.mark.parametrize("frame", [b"\x01", b"\x02\x01" + bytes(8), b"\x01\x09" + bytes(8)])
+def test_malformed_frames_are_rejected(frame):
+    with pytest.raises(ValueError):
+        decode_command(frame)
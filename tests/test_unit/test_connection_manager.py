@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.asyncio import Redis
+
+from watch_together.app.models import Session
+from watch_together.app.services.broadcast import BroadcastEngine
+from watch_together.app.services.websocket import ConnectionManager
+from watch_together.app.db.cache.redis_cache import RedisCacheStorage
+from tests.utils.websockets import FakeWebSocket
+
+
+async def test_join_is_served_locally_while_redis_is_down():
+    # Nothing listens on port 1, every Redis call fails with ConnectionError
+    manager = ConnectionManager(RedisCacheStorage(Redis(port=1)), BroadcastEngine(queue_size=8, send_timeout=1))
+    session = Session()
+    websocket = FakeWebSocket()
+
+    assert await manager.connect(session, websocket) is None
+    assert session.clients == [websocket]
+
+    assert await manager.disconnect(session, websocket) is None
+    await asyncio.sleep(0)
+    assert not manager.dispatcher.rooms
+    assert not manager.broadcaster.channels
+    await manager.close()
+
+
+async def test_failed_join_is_undone():
+    manager = ConnectionManager(RedisCacheStorage(FakeAsyncRedis()), BroadcastEngine(queue_size=8, send_timeout=1))
+    session = Session()
+    websocket = FakeWebSocket()
+
+    async def broken_snapshot(session, websocket):
+        raise RuntimeError("snapshot failed")
+
+    manager.state_handler.handle_join_snapshot = broken_snapshot
+    with pytest.raises(RuntimeError):
+        await manager.connect(session, websocket)
+    await asyncio.sleep(0)
+
+    assert session.clients == []
+    assert not manager.dispatcher.rooms
+    assert not manager.broadcaster.channels
+    assert not manager.presence.counted
+    assert await manager.presence.cache_storage.get(manager.presence.get_key(session)) == b"0"
+    await manager.close()
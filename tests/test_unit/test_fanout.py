@@ -0,0 +1,29 @@
+import asyncio
+
+from watch_together.app.models import Session
+from watch_together.app.services.fanout import RoomFanout
+
+
+class IdlePubSub:
+    """A pub/sub with no confirmed subscription, listen() returns at once."""
+
+    def __init__(self):
+        self.listens = 0
+
+    async def listen(self):
+        self.listens += 1
+        return
+        yield
+
+
+async def test_listener_backs_off_while_subscription_is_pending():
+    fanout = RoomFanout(cache_storage=None, broadcaster=None)
+    fanout.pubsub = IdlePubSub()
+    fanout.rooms["room:fanout"] = Session()
+    listener = asyncio.create_task(fanout.listen())
+
+    await asyncio.sleep(0.12)
+    fanout.rooms.clear()
+    await asyncio.wait_for(listener, 1)
+
+    assert fanout.pubsub.listens <= 4
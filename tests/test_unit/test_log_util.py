@@ -0,0 +1,23 @@
+import queue
+import logging
+
+from watch_together.app.utils.log_util import LazyQueueHandler
+
+
+def test_prepared_record_does_not_reference_mutable_state():
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("test_log_util")
+    logger.addHandler(LazyQueueHandler(log_queue))
+    clients = ["first"]
+
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logger.error("Clients: %s", clients, exc_info=True)
+    clients.append("second")
+    record = log_queue.get_nowait()
+
+    assert record.msg == "Clients: ['first']"
+    assert record.args is None
+    assert record.exc_info is None
+    assert "RuntimeError: boom" in record.exc_text
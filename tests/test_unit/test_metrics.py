@@ -0,0 +1,30 @@
+from watch_together.app.utils.metrics import MetricsRegistry, observe_latency
+
+
+async def test_render_exposition_format():
+    registry = MetricsRegistry()
+    dropped = registry.counter("dropped_total", "Dropped clients")
+    latency = registry.histogram("call_seconds", "Call latency", buckets=(0.1, 1.0))
+    registry.gauge("rooms", "Active rooms", lambda: [({"max_clients": "1"}, 2)])
+    registry.callback_counter("pool_events_total", "Pool events", lambda: [({"stat": "checkouts"}, 7)])
+
+    @observe_latency(latency, method="get")
+    async def call():
+        return "ok"
+
+    dropped.inc(reason="timeout")
+    latency.observe(0.5, method="get")
+    assert await call() == "ok"
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE dropped_total counter" in lines
+    assert 'dropped_total{reason="timeout"} 1' in lines
+    assert 'call_seconds_bucket{method="get",le="0.1"} 1' in lines
+    assert 'call_seconds_bucket{method="get",le="1.0"} 2' in lines
+    assert 'call_seconds_bucket{method="get",le="+Inf"} 2' in lines
+    assert 'call_seconds_count{method="get"} 2' in lines
+    assert 'rooms{max_clients="1"} 2' in lines
+    assert "# TYPE rooms gauge" in lines
+    assert "# TYPE pool_events_total counter" in lines
+    assert 'pool_events_total{stat="checkouts"} 7' in lines
@@ -0,0 +1,45 @@
+from watch_together.app.models import Session
+from watch_together.app.services.broadcast import BroadcastEngine
+from watch_together.app.services.playback_clock import PlaybackClock, RoomClock
+from watch_together.app.services.state_handle import PlaybackState
+from tests.utils.websockets import FakeWebSocket
+
+
+def test_playing_clock_advances():
+    clock = RoomClock(updated_at=100.0)
+    clock.apply("play", 10.0, now=100.0)
+
+    assert clock.current_position(now=103.0) == 13.0
+
+
+def test_seek_keeps_play_state():
+    clock = RoomClock(updated_at=100.0)
+    clock.apply("play", 10.0, now=100.0)
+    clock.apply("seeked", 50.0, now=102.0)
+
+    assert clock.playing
+    assert clock.current_position(now=104.0) == 52.0
+
+    clock.apply("pause", 52.0, now=104.0)
+    assert clock.current_position(now=110.0) == 52.0
+
+
+async def test_evicted_client_is_forgotten():
+    engine = BroadcastEngine(queue_size=1, send_timeout=1)
+    clock = PlaybackClock(engine, tick_interval=60)
+    session = Session()
+    websocket = FakeWebSocket()
+    engine.register(session, websocket)
+    clock.sync_room(session, PlaybackState("play", 0.0, None))
+    clock.pings[id(websocket)] = 1.0
+    clock.rtts[id(websocket)] = 0.2
+
+    # A full outbound queue makes the broadcaster drop the client on its own
+    engine.channels[id(websocket)].offer("pending")
+    await engine.send("overflow", session, websocket)
+
+    assert id(websocket) not in clock.pings
+    assert id(websocket) not in clock.rtts
+    assert session.session_id not in clock.rooms
+    await clock.stop()
+    await engine.close()
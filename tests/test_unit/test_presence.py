@@ -0,0 +1,34 @@
+import asyncio
+
+from fakeredis import FakeAsyncRedis
+
+from watch_together.app.models import Session
+from watch_together.app.services.presence import RoomPresence
+from watch_together.app.db.cache.redis_cache import RedisCacheStorage
+
+
+async def test_counter_outlives_its_ttl_while_clients_stay():
+    redis = FakeAsyncRedis()
+    presence = RoomPresence(RedisCacheStorage(redis), ttl=1)
+    session = Session()
+    session.clients.append(object())
+
+    assert await presence.join(session) == 1
+    await asyncio.sleep(1.5)
+
+    assert await redis.get(presence.get_key(session)) == b"1"
+    session.clients.clear()
+    assert await presence.leave(session) == 0
+    await presence.stop()
+
+
+async def test_leave_after_uncounted_join_keeps_counter():
+    redis = FakeAsyncRedis()
+    presence = RoomPresence(RedisCacheStorage(redis), ttl=60)
+    session = Session()
+    await redis.set(presence.get_key(session), 2)
+
+    # The join of this worker never reached Redis, its leave must not take a count of another worker
+    assert await presence.leave(session) == 2
+    assert await redis.get(presence.get_key(session)) == b"2"
+    await presence.stop()
@@ -0,0 +1,70 @@
+import asyncio
+
+from watch_together.app.models import Session
+from watch_together.app.services.room_dispatcher import RoomDispatcher
+
+
+async def test_room_frames_keep_arrival_order_after_failures():
+    handled = []
+
+    async def handler(data, session, websocket):
+        await asyncio.sleep(0.001)
+        if data["n"] == 1:
+            raise ConnectionError("Redis is unavailable")
+        handled.append((websocket, data["n"]))
+
+    dispatcher = RoomDispatcher(handler, inbox_size=8, put_timeout=0.1)
+    session = Session()
+    dispatcher.open(session, "first")
+    dispatcher.open(session, "second")
+
+    for n in range(4):
+        assert await dispatcher.submit({"n": n}, session, "first" if n % 2 else "second")
+    await asyncio.sleep(0.05)
+
+    assert handled == [("second", 0), ("second", 2), ("first", 3)]
+    await dispatcher.stop()
+
+
+async def test_full_inbox_refuses_frames():
+    blocked = asyncio.Event()
+
+    async def handler(data, session, websocket):
+        await blocked.wait()
+
+    dispatcher = RoomDispatcher(handler, inbox_size=1, put_timeout=0.01)
+    session = Session()
+    dispatcher.open(session, "client")
+
+    assert await dispatcher.submit({}, session, "client")
+    await asyncio.sleep(0)
+    assert await dispatcher.submit({}, session, "client")
+    assert not await dispatcher.submit({}, session, "client")
+    await dispatcher.stop()
+
+
+async def test_rejoin_during_drain_reuses_room_task():
+    handled = []
+
+    async def handler(data, session, websocket):
+        await asyncio.sleep(0.01)
+        handled.append((websocket, data["n"]))
+
+    dispatcher = RoomDispatcher(handler, inbox_size=8, put_timeout=0.1)
+    session = Session()
+    dispatcher.open(session, "first")
+    for n in range(3):
+        assert await dispatcher.submit({"n": n}, session, "first")
+    dispatcher.close(session, "first")
+    task = dispatcher.rooms[session.session_id].task
+
+    dispatcher.open(session, "second")
+    assert dispatcher.rooms[session.session_id].task is task
+    assert await dispatcher.submit({"n": 3}, session, "second")
+    await asyncio.sleep(0.1)
+
+    assert handled == [("first", 0), ("first", 1), ("first", 2), ("second", 3)]
+    assert not task.done()
+    dispatcher.close(session, "second")
+    await asyncio.wait_for(task, 1)
+    assert session.session_id not in dispatcher.rooms
@@ -0,0 +1,10 @@
+import orjson
+
+from watch_together.app.models import Session
+
+
+def test_author_index_is_built_from_friends():
+    session = Session(friends=[{"id": "2", "username": "test2", "first_name": "Anna", "last_name": "Ivanova"}])
+
+    assert orjson.loads(session.get_author("2")) == {"id": "2", "name": "Anna Ivanova"}
+    assert session.get_author("unknown") is None
@@ -0,0 +1,29 @@
+import asyncio
+
+from watch_together.app.models import Session
+from watch_together.app.services.session_registry import SessionRegistry
+
+
+async def test_idle_room_is_evicted_after_grace():
+    registry = SessionRegistry(max_rooms=10, idle_grace=0.01)
+    session = registry.add(Session())
+
+    registry.acquire(session)
+    await asyncio.sleep(0.03)
+    assert registry.get(session.session_id) is session
+
+    registry.release(session)
+    await asyncio.sleep(0.03)
+    assert registry.get(session.session_id) is None
+
+
+async def test_lru_eviction_keeps_rooms_in_use():
+    registry = SessionRegistry(max_rooms=2, idle_grace=60)
+    busy, idle, recent = Session(), Session(), Session()
+    registry.add(busy)
+    registry.acquire(busy)
+    registry.add(idle)
+    registry.add(recent)
+
+    assert list(registry.rooms) == [busy.session_id, recent.session_id]
+    registry.clear()
@@ -0,0 +1,77 @@
+import asyncio
+from uuid import uuid4
+
+from watch_together.app.models import Session
+from watch_together.app.services import sessions
+
+
+class CountingStorage:
+    def __init__(self, documents: dict):
+        self.documents = documents
+        self.calls = 0
+
+    async def get_session(self, session_id):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.documents.get(session_id)
+
+
+async def test_concurrent_lookups_share_one_query(monkeypatch):
+    session = Session(movie_id="movie")
+    document = session.model_dump(mode="json", exclude={"clients"}) | {"_id": str(session.session_id)}
+    storage = CountingStorage({session.session_id: document})
+    monkeypatch.setattr(sessions, "get_session_storage", lambda: storage)
+
+    found = await asyncio.gather(*[sessions.get_session(session.session_id) for _ in range(5)])
+
+    assert storage.calls == 1
+    assert all(isinstance(item, Session) and item is found[0] for item in found)
+    assert await sessions.get_session(session.session_id) is found[0]
+    assert storage.calls == 1
+    sessions.active_sessions.evict(session.session_id)
+
+
+async def test_missing_session_is_cached(monkeypatch):
+    storage = CountingStorage({})
+    monkeypatch.setattr(sessions, "get_session_storage", lambda: storage)
+    session_id = uuid4()
+
+    assert await sessions.get_session(session_id) is None
+    assert await sessions.get_session(session_id) is None
+    assert storage.calls == 1
+
+
+class FinishingStorage:
+    def __init__(self):
+        self.finished = {}
+
+    async def finish_session(self, session_id, finished_at):
+        self.finished[session_id] = finished_at
+
+    async def reopen_session(self, session_id):
+        self.finished[session_id] = None
+
+
+async def test_session_with_clients_on_another_worker_is_not_finished(monkeypatch):
+    storage = FinishingStorage()
+    monkeypatch.setattr(sessions, "get_session_storage", lambda: storage)
+    session = Session()
+
+    await sessions.mark_session_finished(session, viewers=1)
+    assert session.session_id not in storage.finished
+
+    await sessions.mark_session_finished(session, viewers=0)
+    assert storage.finished[session.session_id] is not None
+
+
+async def test_first_client_reopens_session_finished_by_another_worker(monkeypatch):
+    storage = FinishingStorage()
+    monkeypatch.setattr(sessions, "get_session_storage", lambda: storage)
+    session = Session()
+    storage.finished[session.session_id] = "finished elsewhere"
+
+    await sessions.mark_session_active(session, viewers=2)
+    assert storage.finished[session.session_id] == "finished elsewhere"
+
+    await sessions.mark_session_active(session, viewers=1)
+    assert storage.finished[session.session_id] is None
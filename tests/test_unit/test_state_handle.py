@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from watch_together.app.services.state_handle import PlaybackState
+
+
+def test_playing_state_advances_from_action_time():
+    state = PlaybackState.from_values([b"play", b"10.5", b"1000.0", None])
+
+    assert state.current_position(now=1004.0) == 14.5
+
+
+def test_paused_state_keeps_position():
+    state = PlaybackState.from_values([b"pause", b"10.5", b"1000.0", None])
+
+    assert state.current_position(now=1004.0) == 10.5
+
+
+def test_missing_fields():
+    assert PlaybackState.from_values([None, None, None, None]) is None
+    assert PlaybackState.from_values([None, b"3", None, None]) == PlaybackState("pause", 3.0, None)
+
+
+def test_legacy_timestamp_action_fallback():
+    recorded = datetime(2024, 1, 1, 12, 0, 0, 500000)
+    state = PlaybackState.from_values([b"play", b"10.5", None, str(recorded).encode()])
+
+    assert state.action_time == recorded.timestamp()
+    assert state.current_position(now=recorded.timestamp() + 4) == 14.5
+
+
+def test_action_time_wins_over_legacy_field():
+    state = PlaybackState.from_values([b"play", b"10.5", b"1000.0", b"2024-01-01 12:00:00.500000"])
+
+    assert state.action_time == 1000.0
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from watch_together.app.utils.ttl_cache import AsyncTTLCache
+
+
+async def test_concurrent_loads_are_coalesced():
+    cache = AsyncTTLCache(ttl=60, max_size=10)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": "1"}
+
+    results = await asyncio.gather(*[cache.get_or_load("token", load) for _ in range(5)])
+
+    assert calls == 1
+    assert all(result == {"id": "1"} for result in results)
+
+
+async def test_failed_load_is_not_cached():
+    cache = AsyncTTLCache(ttl=60, max_size=10)
+
+    async def load():
+        raise ValueError("auth service is down")
+
+    with pytest.raises(ValueError):
+        await cache.get_or_load("token", load)
+
+    assert "token" not in cache
+
+
+def test_expired_and_evicted_entries():
+    cache = AsyncTTLCache(ttl=60, max_size=2)
+    cache.set("expired", 1, ttl=0)
+    cache.set("first", 2)
+    cache.set("second", 3)
+    cache.set("third", 4)
+
+    assert cache.get("expired") is None
+    assert cache.get("first") is None
+    assert cache.get("third") == 4
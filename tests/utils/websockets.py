@@ -0,0 +1,24 @@
+import asyncio
+
+
+class FakeWebSocket:
+    scope = {"subprotocols": []}
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.received = []
+        self.closed = False
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, message: str):
+        await asyncio.sleep(self.delay)
+        self.received.append(message)
+
+    async def send_bytes(self, message: bytes):
+        await self.send_text(message)
+
+    async def close(self, code=1000):
+        self.closed = True
+        self.close_code = code
@@ -0,0 +1,55 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from watch_together.app.db import mongo
+from watch_together.app.services.sessions import active_sessions
+from watch_together.app.utils.metrics import registry
+
+ROOM_SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100)
+
+router = APIRouter(tags=["Metrics"])
+
+
+def active_rooms() -> int:
+    return sum(1 for session in active_sessions.rooms.values() if session.clients)
+
+
+def connected_clients() -> int:
+    return sum(len(session.clients) for session in active_sessions.rooms.values())
+
+
+def rooms_by_clients() -> list[tuple[dict, int]]:
+    """Count of active rooms with at most `max_clients` clients.
+
+    A scrape-time snapshot, so it is a gauge: the `le` label is reserved for histogram buckets.
+    """
+    sizes = [len(session.clients) for session in active_sessions.rooms.values() if session.clients]
+    samples = [({"max_clients": str(bound)}, sum(1 for size in sizes if size <= bound)) for bound in ROOM_SIZE_BUCKETS]
+    samples.append(({"max_clients": "+Inf"}, len(sizes)))
+    return samples
+
+
+def mongo_pool(levels: bool) -> list[tuple[dict, int]]:
+    """Connection counts when `levels` is set, otherwise the cumulative pool event counters."""
+    if mongo.mongo_client is None:
+        return []
+    return [
+        ({"stat": name}, value)
+        for name, value in mongo.mongo_client.get_pool_stats().items()
+        if (name in mongo.PoolMetrics.LEVELS) == levels
+    ]
+
+
+registry.gauge("watch_together_sessions", "Sessions kept in memory", lambda: len(active_sessions))
+registry.gauge("watch_together_active_rooms", "Sessions with at least one connected client", active_rooms)
+registry.gauge("watch_together_clients", "Connected websocket clients", connected_clients)
+registry.gauge("watch_together_rooms_by_clients", "Active rooms by number of connected clients", rooms_by_clients)
+registry.gauge("watch_together_mongo_pool", "Mongo connection pool size", lambda: mongo_pool(levels=True))
+registry.callback_counter(
+    "watch_together_mongo_pool_events_total", "Mongo connection pool events", lambda: mongo_pool(levels=False)
+)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, summary="Prometheus metrics")
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
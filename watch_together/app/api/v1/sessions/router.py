@@ -1,7 +1,8 @@
 import json
+import logging
 from uuid import UUID
 
-from fastapi import APIRouter, WebSocket, Depends, HTTPException, WebSocketDisconnect, status
+from fastapi import APIRouter, WebSocket, Depends, HTTPException, WebSocketDisconnect, Query, status
 from fastapi.logger import logger
 from redis.asyncio import Redis
 from pymongo.errors import ServerSelectionTimeoutError
@@ -9,19 +10,38 @@ from pymongo.errors import ServerSelectionTimeoutError
 from watch_together.app.config import settings
 from watch_together.app.services import sessions
 from watch_together.app.services.sessions import get_session
+from watch_together.app.services.broadcast import BroadcastEngine
+from watch_together.app.services.command_protocol import decode_command
 from watch_together.app.services.websocket import ConnectionManager
 from watch_together.app.db.cache.redis_cache import RedisCacheStorage
 from watch_together.app.utils.auth_util import get_current_user, get_user_friends
-from watch_together.app.api.v1.sessions.schemas import SessionId, AuthUserResponse, CreateSession
+from watch_together.app.utils.log_util import log_sampled
+from watch_together.app.utils.metrics import registry
+from watch_together.app.api.v1.sessions.schemas import (
+    SessionId,
+    AuthUserResponse,
+    CreateSession,
+    SessionPage,
+    SessionSummary,
+)
 
 
 router = APIRouter(prefix="/session", tags=["Session"])
 
 manager = ConnectionManager(
     RedisCacheStorage(Redis(host=settings.redis_host, port=settings.redis_port)),
+    BroadcastEngine(settings.broadcast_queue_size, settings.broadcast_send_timeout),
 )
 
 
+def send_queue_depth() -> list[tuple[dict, int]]:
+    depths = manager.broadcaster.queue_depths()
+    return [({"stat": "total"}, sum(depths)), ({"stat": "max"}, max(depths, default=0))]
+
+
+registry.gauge("watch_together_send_queue_depth", "Frames waiting in client send queues", send_queue_depth)
+
+
 @router.get("/test")
 async def test_session():
     return "App is healthy"
@@ -53,10 +73,21 @@ async def get_friends(friends_list=Depends(get_user_friends)):
     return {"friends": friends_list}
 
 
-@router.get("/view_sessions")
-async def view_sessions():
-    session = await sessions.get_active_sessions()
-    return str(session)
+@router.get("/view_sessions", response_model=SessionPage, summary="Page of active sessions")
+async def view_sessions(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500)):
+    total, page = sessions.get_active_sessions_page(offset, limit)
+    return SessionPage(
+        total=total,
+        sessions=[
+            SessionSummary(
+                session_id=session.session_id,
+                movie_id=session.movie_id,
+                clients=len(session.clients),
+                created_at=session.created_at,
+            )
+            for session in page
+        ],
+    )
 
 
 @router.websocket("/ws/join_session/{session_id}")
@@ -67,21 +98,42 @@ async def websocket_endpoint(websocket: WebSocket, session_id: UUID):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Session with session_id {session_id} not found"
         )
+    sessions.acquire_session(session)
     try:
-        await manager.connect(session, websocket)
-    except ConnectionError:
-        logger.error("Redis is unavailable")
-    try:
+        viewers = await manager.connect(session, websocket)
+        await sessions.mark_session_active(session, viewers)
         while True:
-            logger.info("trying to receive message")
-            receive_data = await websocket.receive_text()  # noqa: F841
-            logger.info(f"received: {receive_data}")
-
-            data = json.loads(receive_data)
-
-            await manager.handle_message(data, session, websocket)
-
-    except WebSocketDisconnect:
-        await manager.disconnect(session, websocket)
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message["code"], message.get("reason"))
+            receive_data = message["text"] if message.get("text") is not None else message["bytes"]
+            log_sampled(logger, logging.INFO, "Received frame", session_id=str(session_id), size=len(receive_data))
+
+            if isinstance(receive_data, bytes):
+                try:
+                    data = decode_command(receive_data)
+                except ValueError as ex:
+                    logger.warning("Dropped malformed command frame in session %s: %s", session_id, ex)
+                    continue
+            else:
+                try:
+                    data = json.loads(receive_data)
+                except json.JSONDecodeError as ex:
+                    logger.warning("Dropped malformed frame in session %s: %s", session_id, ex)
+                    continue
+                if not isinstance(data, dict):
+                    logger.warning("Dropped non-object frame in session %s", session_id)
+                    continue
+
+            if not await manager.submit(data, session, websocket):
+                # manager.disconnect evicts the client and closes the socket once
+                logger.warning("Inbox overflow, disconnecting client %s of session %s", id(websocket), session_id)
+                raise WebSocketDisconnect(status.WS_1013_TRY_AGAIN_LATER)
+
+    except WebSocketDisconnect as ex:
+        viewers = await manager.disconnect(session, websocket, ex.code)
+        await sessions.mark_session_finished(session, viewers)
     except ConnectionError:
         logger.error("Redis is unavailable")
+    finally:
+        sessions.release_session(session)
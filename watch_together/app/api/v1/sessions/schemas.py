@@ -43,3 +43,15 @@ class CommandResponse(BaseModel):
     author_id: str | None = None
     commandType: str | None = None
     timestamp: float | None = None
+
+
+class SessionSummary(BaseModel):
+    session_id: UUID
+    movie_id: str
+    clients: int
+    created_at: datetime
+
+
+class SessionPage(BaseModel):
+    total: int
+    sessions: List[SessionSummary]
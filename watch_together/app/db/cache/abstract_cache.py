@@ -10,14 +10,40 @@ class AbstractCacheStorage(ABC):
     @abstractmethod
     async def set(self, key: str, data: str, exp: timedelta | int, **kwargs): ...
 
+    @abstractmethod
+    async def incrby(self, key: str, amount: int, exp: timedelta | int) -> int: ...
+
+    @abstractmethod
+    async def expire_many(self, keys: list[str], exp: timedelta | int): ...
+
     @abstractmethod
     async def hset(self, key: str, name: str, data: str): ...
 
     @abstractmethod
-    async def rpush(self, key: str, data: str): ...
+    async def hset_mapping(self, key: str, mapping: dict, exp: timedelta | int | None = None): ...
+
+    @abstractmethod
+    async def rpush(self, key: str, data: str | bytes): ...
+
+    @abstractmethod
+    async def rpush_capped(self, key: str, data: str | bytes, max_length: int, exp: timedelta | int): ...
 
     @abstractmethod
     async def lrange(self, key: str, start: int, stop: int): ...
 
     @abstractmethod
     async def hvals(self, key: str): ...
+
+    @abstractmethod
+    async def hmget(self, key: str, fields: tuple[str, ...]) -> list: ...
+
+    @abstractmethod
+    async def publish(self, channel: str, data: bytes): ...
+
+    @abstractmethod
+    def pubsub(self): ...
+
+    @abstractmethod
+    async def hmget_lrange(
+        self, hash_key: str, fields: tuple[str, ...], list_key: str, start: int, stop: int
+    ) -> tuple[list, list]: ...
@@ -2,27 +2,88 @@ from redis.asyncio import Redis
 from datetime import timedelta
 
 from watch_together.app.db.cache.abstract_cache import AbstractCacheStorage
+from watch_together.app.utils.metrics import registry, observe_latency
+
+REDIS_LATENCY = registry.histogram("watch_together_redis_call_seconds", "Redis call latency by storage method")
 
 
 class RedisCacheStorage(AbstractCacheStorage):
     def __init__(self, redis: Redis):
         self.redis = redis
 
+    @observe_latency(REDIS_LATENCY, method="get")
     async def get(self, key: str, **kwargs):
         return await self.redis.get(key)
 
+    @observe_latency(REDIS_LATENCY, method="set")
     async def set(self, key: str, data: str, exp: timedelta | int, **kwargs):
         data_bytes = data.encode("utf-8")
         await self.redis.set(key, data_bytes, exp)
 
+    @observe_latency(REDIS_LATENCY, method="incrby")
+    async def incrby(self, key: str, amount: int, exp: timedelta | int) -> int:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.incrby(key, amount)
+            pipe.expire(key, exp)
+            value, _ = await pipe.execute()
+        return value
+
+    @observe_latency(REDIS_LATENCY, method="expire_many")
+    async def expire_many(self, keys: list[str], exp: timedelta | int):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.expire(key, exp)
+            await pipe.execute()
+
+    @observe_latency(REDIS_LATENCY, method="hset")
     async def hset(self, key: str, name: str, data: str):
         await self.redis.hset(key, name, data)
 
-    async def rpush(self, key: str, data: str):
+    @observe_latency(REDIS_LATENCY, method="hset_mapping")
+    async def hset_mapping(self, key: str, mapping: dict, exp: timedelta | int | None = None):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=mapping)
+            if exp is not None:
+                pipe.expire(key, exp)
+            await pipe.execute()
+
+    @observe_latency(REDIS_LATENCY, method="rpush")
+    async def rpush(self, key: str, data: str | bytes):
         await self.redis.rpush(key, data)
 
+    @observe_latency(REDIS_LATENCY, method="rpush_capped")
+    async def rpush_capped(self, key: str, data: str | bytes, max_length: int, exp: timedelta | int):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(key, data)
+            pipe.ltrim(key, -max_length, -1)
+            pipe.expire(key, exp)
+            await pipe.execute()
+
+    @observe_latency(REDIS_LATENCY, method="lrange")
     async def lrange(self, key: str, start: int, stop: int):
         return await self.redis.lrange(key, start, stop)
 
+    @observe_latency(REDIS_LATENCY, method="hvals")
     async def hvals(self, key: str):
         return await self.redis.hvals(key)
+
+    @observe_latency(REDIS_LATENCY, method="hmget")
+    async def hmget(self, key: str, fields: tuple[str, ...]) -> list:
+        return await self.redis.hmget(key, fields)
+
+    @observe_latency(REDIS_LATENCY, method="hmget_lrange")
+    async def hmget_lrange(
+        self, hash_key: str, fields: tuple[str, ...], list_key: str, start: int, stop: int
+    ) -> tuple[list, list]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hmget(hash_key, fields)
+            pipe.lrange(list_key, start, stop)
+            hash_values, list_values = await pipe.execute()
+        return hash_values, list_values
+
+    @observe_latency(REDIS_LATENCY, method="publish")
+    async def publish(self, channel: str, data: bytes):
+        await self.redis.publish(channel, data)
+
+    def pubsub(self):
+        return self.redis.pubsub()
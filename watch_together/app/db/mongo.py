@@ -1,36 +1,152 @@
+import threading
+from datetime import datetime
+
 from fastapi.logger import logger
+from pymongo import monitoring, IndexModel, ASCENDING, DESCENDING
 
 from motor.motor_asyncio import AsyncIOMotorClient
 from watch_together.app.config import get_settings, Settings
 from watch_together.app.models import Session
+from watch_together.app.utils.metrics import registry, observe_latency
+
+SESSIONS_COLLECTION = "sessions"
+
+MONGO_LATENCY = registry.histogram("watch_together_mongo_call_seconds", "Mongo call latency by client method")
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Collects connection pool counters, pymongo calls it from its own threads."""
+
+    # Current pool size, every other counter only ever grows
+    LEVELS = ("connections_open", "connections_in_use")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {
+            "connections_open": 0,
+            "connections_in_use": 0,
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "pool_clears": 0,
+        }
+
+    def increment(self, *names: str, delta: int = 1):
+        with self.lock:
+            for name in names:
+                self.counters[name] += delta
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self.increment("pool_clears")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.increment("connections_open", "connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.increment("connections_closed")
+        self.increment("connections_open", delta=-1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.increment("checkout_failures")
+
+    def connection_checked_out(self, event):
+        self.increment("checkouts", "connections_in_use")
+
+    def connection_checked_in(self, event):
+        self.increment("connections_in_use", delta=-1)
 
 
 class MongoClient:
+    """Keeps every session as a document of the single `sessions` collection, keyed by session id."""
+
     def __init__(self, settings: Settings):
-        self.engine = AsyncIOMotorClient(settings.mongo_conn)
+        self.pool_metrics = PoolMetrics()
+        self.engine = AsyncIOMotorClient(
+            settings.mongo_conn,
+            maxPoolSize=settings.mongo_max_pool_size,
+            minPoolSize=settings.mongo_min_pool_size,
+            maxIdleTimeMS=settings.mongo_max_idle_time_ms,
+            event_listeners=[self.pool_metrics],
+        )
+        self.db_name = settings.mongo_db_name
+        self.finished_session_ttl = settings.finished_session_ttl
+
+    @property
+    def sessions(self):
+        return self.engine.get_database(self.db_name).get_collection(SESSIONS_COLLECTION)
 
     async def init_db(self, db_name: str):
-        self.engine.get_database(db_name)
+        self.db_name = db_name
+        await self.sessions.create_indexes(
+            [
+                IndexModel([("participant", ASCENDING)]),
+                IndexModel([("movie_id", ASCENDING)]),
+                IndexModel([("created_at", DESCENDING)]),
+                IndexModel([("finished_at", ASCENDING)], expireAfterSeconds=self.finished_session_ttl),
+            ]
+        )
 
     async def close_connection(self):
         self.engine.close()
 
+    def get_pool_stats(self) -> dict:
+        return self.pool_metrics.snapshot()
+
+    @observe_latency(MONGO_LATENCY, method="get_session")
     async def get_session(self, session_id) -> Session:
-        db = self.engine.get_database("sessions")
-        session_collection = db.get_collection(str(session_id))
-        session = await session_collection.find_one({"_id": str(session_id)})
-        logger.info("Get session from mongo: %s", session)
+        session = await self.sessions.find_one({"_id": str(session_id)})
+        logger.debug("Get session from mongo: %s", session)
         return session
 
+    @observe_latency(MONGO_LATENCY, method="save_session")
     async def save_session(self, session: Session) -> Session:
-        db = self.engine.get_database("sessions")
-        session_collection = db.get_collection(str(session.session_id))
-        prep_session = session.model_dump(mode="json")
+        prep_session = session.model_dump(mode="json", exclude={"clients"})
         prep_session["_id"] = str(session.session_id)
-        saved_session = await session_collection.insert_one(prep_session)
+        # TTL index works only on BSON dates, so datetimes are stored as is
+        prep_session["created_at"] = session.created_at
+        prep_session["finished_at"] = session.finished_at
+        saved_session = await self.sessions.insert_one(prep_session)
         logger.info("Saved session to mongo: %s", saved_session)
         return session
 
+    @observe_latency(MONGO_LATENCY, method="set_session_finished")
+    async def set_session_finished(self, session_id, finished_at: datetime | None):
+        await self.sessions.update_one({"_id": str(session_id)}, {"$set": {"finished_at": finished_at}})
+
+
+mongo_client: MongoClient | None = None
+
 
 def get_mongodb_client(settings: Settings = get_settings()) -> MongoClient:
-    return MongoClient(settings)
+    """Returns the process-wide client, its connection pool is shared by all requests."""
+    global mongo_client
+    if mongo_client is None:
+        mongo_client = MongoClient(settings)
+    return mongo_client
+
+
+async def close_mongodb_client():
+    global mongo_client
+    if mongo_client is not None:
+        await mongo_client.close_connection()
+        mongo_client = None
@@ -1,4 +1,6 @@
 from uuid import UUID
+from datetime import datetime
+
 from watch_together.app.models import Session
 from watch_together.app.db.mongo import get_mongodb_client
 
@@ -14,6 +16,12 @@ class SessionStorageProvider:
     async def save_session(self, session: Session) -> str:
         return await self.client.save_session(session)
 
+    async def finish_session(self, session_id: UUID, finished_at: datetime):
+        await self.client.set_session_finished(session_id, finished_at)
+
+    async def reopen_session(self, session_id: UUID):
+        await self.client.set_session_finished(session_id, None)
+
 
 def get_session_storage() -> SessionStorageProvider:
     return SessionStorageProvider(client=get_mongodb_client())
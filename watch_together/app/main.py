@@ -1,4 +1,3 @@
-import logging
 import uvicorn
 
 from fastapi import FastAPI
@@ -9,20 +8,27 @@ from contextlib import asynccontextmanager
 
 from watch_together.app.config import get_settings  # noqa: F401
 from watch_together.app.api.v1 import sessions
-from watch_together.app.db.mongo import get_mongodb_client
+from watch_together.app.api import metrics
+from watch_together.app.api.v1.sessions.router import manager as connection_manager
+from watch_together.app.db.mongo import get_mongodb_client, close_mongodb_client
+from watch_together.app.utils.auth_util import close_http_client
+from watch_together.app.utils.log_util import configure_logging
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    mongo_client = get_mongodb_client(settings=get_settings())
-    await mongo_client.init_db("sessions")
+    settings = get_settings()
+    mongo_client = get_mongodb_client(settings=settings)
+    await mongo_client.init_db(settings.mongo_db_name)
     yield
-    await mongo_client.close_connection()
+    await connection_manager.close()
+    await close_http_client()
+    await close_mongodb_client()
 
 
 def build_app():
-    logger.setLevel(logging.INFO)
-    logger.addHandler(logging.StreamHandler())
+    settings = get_settings()
+    configure_logging(logger, settings.log_level, settings.log_sample_rate)
     logger.info("Starting App")
 
     api_app = FastAPI(
@@ -44,6 +50,7 @@ def build_app():
     )
 
     api_app.include_router(sessions.router, prefix="/api/v1")
+    api_app.include_router(metrics.router)
 
     return api_app
 
@@ -1,8 +1,10 @@
 from uuid import uuid4, UUID
-from typing import List, Dict
-from fastapi import WebSocket
+from typing import Any, List, Dict
+from datetime import datetime, timezone
 
-from pydantic import Field, BaseModel
+import orjson
+from fastapi import WebSocket
+from pydantic import Field, BaseModel, PrivateAttr
 
 
 class Session(BaseModel):
@@ -11,6 +13,23 @@ class Session(BaseModel):
     friends: List[Dict[str, str]] = Field(default=[])
     movie_id: str = Field(default="")
     participant: List[str] = Field(default=[])
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    finished_at: datetime | None = Field(default=None)
+
+    _author_index: Dict[str, bytes] = PrivateAttr(default_factory=dict)
 
     class Config:
         arbitrary_types_allowed = True
+
+    def model_post_init(self, __context: Any):
+        self.build_author_index()
+
+    def build_author_index(self):
+        """Pre-serializes chat authors, so message enrichment is a dict lookup."""
+        self._author_index = {}
+        for friend in self.friends:
+            name = f"{friend.get('first_name', '')} {friend.get('last_name', '')}".strip()
+            self._author_index[friend["id"]] = orjson.dumps({"id": friend["id"], "name": name})
+
+    def get_author(self, author_id: str) -> bytes | None:
+        return self._author_index.get(author_id)
@@ -0,0 +1,61 @@
+import asyncio
+import argparse
+from uuid import UUID
+from datetime import datetime, timezone
+
+from fastapi.logger import logger
+
+from watch_together.app.config import get_settings
+from watch_together.app.utils.log_util import configure_logging
+from watch_together.app.db.mongo import MongoClient, SESSIONS_COLLECTION
+
+
+def is_session_collection(name: str) -> bool:
+    try:
+        UUID(name)
+    except ValueError:
+        return False
+    return True
+
+
+async def migrate_sessions(dry_run: bool):
+    settings = get_settings()
+    mongo_client = MongoClient(settings)
+    await mongo_client.init_db(settings.mongo_db_name)
+    db = mongo_client.engine.get_database(settings.mongo_db_name)
+
+    names = [name for name in await db.list_collection_names() if is_session_collection(name)]
+    logger.info("Found %s per-session collections", len(names))
+
+    migrated = skipped = 0
+    for name in names:
+        legacy_collection = db.get_collection(name)
+        document = await legacy_collection.find_one({"_id": name})
+        if document is None:
+            # Nothing to fold in, the collection is kept for a manual look
+            logger.warning("Collection %s holds no session document, skipped", name)
+            skipped += 1
+            continue
+        document.pop("clients", None)
+        document.setdefault("created_at", datetime.now(timezone.utc))
+        document.setdefault("finished_at", None)
+        if not dry_run:
+            result = await db.get_collection(SESSIONS_COLLECTION).replace_one({"_id": name}, document, upsert=True)
+            if not result.acknowledged:
+                logger.warning("Session %s was not written, collection kept", name)
+                skipped += 1
+                continue
+            await legacy_collection.drop()
+        migrated += 1
+
+    await mongo_client.close_connection()
+    action = "Would migrate" if dry_run else "Migrated"
+    logger.info("%s %s sessions into '%s' collection, skipped %s", action, migrated, SESSIONS_COLLECTION, skipped)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold per-session collections into the sessions collection")
+    parser.add_argument("--dry-run", action="store_true", help="Only count sessions, do not write anything")
+    args = parser.parse_args()
+    configure_logging(logger, get_settings().log_level, 1.0)
+    asyncio.run(migrate_sessions(args.dry_run))
@@ -0,0 +1,139 @@
+import time
+import asyncio
+from typing import Callable
+
+import orjson
+from fastapi import WebSocket, status
+from fastapi.logger import logger
+from pydantic import BaseModel
+
+from watch_together.app.models.sessions import Session
+from watch_together.app.utils.metrics import registry
+
+BROADCAST_LATENCY = registry.histogram(
+    "watch_together_broadcast_seconds", "Time to enqueue a frame for every client of a room"
+)
+SEND_LATENCY = registry.histogram("watch_together_send_seconds", "Time from enqueueing a frame to the socket write")
+DROPPED_CLIENTS = registry.counter("watch_together_dropped_clients_total", "Clients evicted by the broadcaster")
+
+
+def encode_frame(payload: dict | BaseModel) -> bytes:
+    """Serialize a payload once so the same buffer can be pushed to every socket."""
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump()
+    return orjson.dumps(payload)
+
+
+class ClientChannel:
+    """Bounded outbound queue with a dedicated sender task for one websocket client."""
+
+    def __init__(self, session: Session, websocket: WebSocket, engine: "BroadcastEngine", binary: bool = False):
+        self.session = session
+        self.websocket = websocket
+        self.engine = engine
+        self.binary = binary
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=engine.queue_size)
+        self.task = asyncio.create_task(self.run())
+
+    def offer(self, message: str | bytes) -> bool:
+        try:
+            self.queue.put_nowait((message, time.perf_counter()))
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def run(self):
+        while True:
+            message, queued_at = await self.queue.get()
+            if isinstance(message, bytes):
+                sending = self.websocket.send_bytes(message)
+            else:
+                sending = self.websocket.send_text(message)
+            try:
+                await asyncio.wait_for(sending, timeout=self.engine.send_timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Send deadline exceeded, evicting client %s", id(self.websocket))
+                DROPPED_CLIENTS.inc(reason="timeout")
+                await self.engine.evict(self.session, self.websocket)
+                return
+            except Exception as ex:
+                logger.warning("Send failed, evicting client %s: %s", id(self.websocket), ex)
+                DROPPED_CLIENTS.inc(reason="error")
+                await self.engine.evict(self.session, self.websocket)
+                return
+            SEND_LATENCY.observe(time.perf_counter() - queued_at)
+
+    def close(self):
+        if self.task is not asyncio.current_task():
+            self.task.cancel()
+
+
+class BroadcastEngine:
+    """Fans messages out to all session clients concurrently.
+
+    Every client gets its own bounded queue drained by a sender task, so a slow
+    or dead socket never delays delivery to the rest of the room. Clients whose
+    queue overflows or whose send misses the deadline are evicted.
+    """
+
+    def __init__(self, queue_size: int, send_timeout: float):
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.channels: dict[int, ClientChannel] = {}
+        self.closing: set[asyncio.Task] = set()
+        self.evict_hooks: list[Callable[[Session, WebSocket], None]] = []
+
+    def add_evict_hook(self, hook: Callable[[Session, WebSocket], None]):
+        """Hooks are called once per client, whether it left or was dropped by the broadcaster."""
+        self.evict_hooks.append(hook)
+
+    def register(self, session: Session, websocket: WebSocket, binary: bool = False):
+        """Binary clients negotiated the command subprotocol and get `binary_message` frames where given."""
+        self.channels[id(websocket)] = ClientChannel(session, websocket, self, binary)
+        session.clients.append(websocket)
+
+    async def send(self, message: str | bytes, session: Session, websocket: WebSocket):
+        channel = self.channels.get(id(websocket))
+        if channel is None:
+            await self.evict(session, websocket)
+        elif not channel.offer(message):
+            logger.warning("Outbound queue overflow, evicting client %s", id(websocket))
+            DROPPED_CLIENTS.inc(reason="overflow")
+            await self.evict(session, websocket)
+
+    async def broadcast(self, message: str | bytes, session: Session, binary_message: bytes | None = None):
+        started = time.perf_counter()
+        for client in list(session.clients):
+            channel = self.channels.get(id(client))
+            if binary_message is not None and channel is not None and channel.binary:
+                await self.send(binary_message, session, client)
+            else:
+                await self.send(message, session, client)
+        BROADCAST_LATENCY.observe(time.perf_counter() - started)
+
+    def queue_depths(self) -> list[int]:
+        return [channel.queue.qsize() for channel in self.channels.values()]
+
+    async def close(self):
+        for channel in list(self.channels.values()):
+            await self.evict(channel.session, channel.websocket)
+        await asyncio.gather(*self.closing, return_exceptions=True)
+
+    async def evict(self, session: Session, websocket: WebSocket, code: int = status.WS_1000_NORMAL_CLOSURE):
+        session.clients[:] = [client for client in session.clients if client is not websocket]
+        channel = self.channels.pop(id(websocket), None)
+        if channel is None:
+            return
+        channel.close()
+        for hook in self.evict_hooks:
+            hook(session, websocket)
+        # A close handshake with a dead peer must not hold up the fan-out of the room
+        closing = asyncio.create_task(self.close_socket(websocket, code))
+        self.closing.add(closing)
+        closing.add_done_callback(self.closing.discard)
+
+    async def close_socket(self, websocket: WebSocket, code: int):
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=self.send_timeout)
+        except Exception as ex:
+            logger.debug("Websocket already closed: %s", ex)
@@ -0,0 +1,125 @@
+import time
+import asyncio
+from uuid import UUID
+from functools import partial
+from typing import Awaitable, Callable
+
+from fastapi import WebSocket
+from fastapi.logger import logger
+
+from watch_together.app.models.sessions import Session
+
+CommandHandler = Callable[[dict, Session, WebSocket], Awaitable[None]]
+RoomScheduler = Callable[[Session, Callable[[], Awaitable[None]]], bool]
+
+
+class TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated_at")
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+
+    def allow(self, now: float) -> bool:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class CommandCoalescer:
+    """Rate limits playback commands per user and collapses seek storms per room.
+
+    The first seek of a room is delivered at once and opens a window, seeks
+    arriving inside the window replace each other and only the latest one is
+    delivered when the window closes. Play and pause flush a pending seek first,
+    so the order of commands within a room is preserved.
+
+    Seeks are not charged to the user rate limit, the window already bounds them
+    to two deliveries per window and the final position of a scrub is never lost.
+    Play and pause over the limit are passed to `on_rejected` instead of the handler.
+
+    A window that closes with a pending seek hands the flush to `schedule`, which
+    runs it in the processing order of the room rather than from the window task.
+    """
+
+    def __init__(
+        self,
+        handler: CommandHandler,
+        on_rejected: CommandHandler,
+        schedule: RoomScheduler,
+        window: float,
+        rate: float,
+        burst: int,
+    ):
+        self.handler = handler
+        self.on_rejected = on_rejected
+        self.schedule = schedule
+        self.window = window
+        self.rate = rate
+        self.burst = burst
+        self.pending: dict[UUID, tuple[dict, WebSocket]] = {}
+        self.windows: dict[UUID, asyncio.Task] = {}
+        self.buckets: dict[tuple[UUID, str], TokenBucket] = {}
+
+    def allow(self, session: Session, user_id: str) -> bool:
+        key = (session.session_id, user_id)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.rate, self.burst)
+        return bucket.allow(time.monotonic())
+
+    async def submit(self, data: dict, session: Session, websocket: WebSocket):
+        if data["commandType"] != "seeked":
+            if not self.allow(session, data["userId"]):
+                logger.debug("Command rate exceeded by user %s in session %s", data["userId"], session.session_id)
+                await self.on_rejected(data, session, websocket)
+                return
+            await self.flush(session)
+            await self.handler(data, session, websocket)
+            return
+
+        if session.session_id in self.windows:
+            self.pending[session.session_id] = (data, websocket)
+            return
+        self.windows[session.session_id] = asyncio.create_task(self.run_window(session))
+        await self.handler(data, session, websocket)
+
+    async def flush(self, session: Session):
+        pending = self.pending.pop(session.session_id, None)
+        if pending is not None:
+            data, websocket = pending
+            await self.handler(data, session, websocket)
+
+    async def run_window(self, session: Session):
+        try:
+            while True:
+                await asyncio.sleep(self.window)
+                if session.session_id not in self.pending:
+                    break
+                if not self.schedule(session, partial(self.flush, session)):
+                    logger.debug("Session %s is gone, dropping coalesced seek", session.session_id)
+                    self.pending.pop(session.session_id, None)
+                    break
+        finally:
+            self.windows.pop(session.session_id, None)
+
+    def forget_room(self, session: Session):
+        if session.clients:
+            return
+        self.pending.pop(session.session_id, None)
+        window = self.windows.pop(session.session_id, None)
+        if window is not None:
+            window.cancel()
+        for key in [key for key in self.buckets if key[0] == session.session_id]:
+            del self.buckets[key]
+
+    def close(self):
+        for window in self.windows.values():
+            window.cancel()
+        self.windows.clear()
+        self.pending.clear()
@@ -0,0 +1,50 @@
+"""Binary framing of playback commands, negotiated as a websocket subprotocol.
+
+A command frame is a fixed header followed by the UTF-8 user id:
+
+    frame type (uint8) | command code (uint8) | timestamp (float64, big endian) | user id
+
+Clients that do not offer the subprotocol keep exchanging JSON frames, chat
+and service frames are JSON for everybody.
+"""
+
+import struct
+
+import orjson
+
+SUBPROTOCOL = "watch-together.commands.v1"
+
+FRAME_COMMAND = 1
+COMMAND_HEADER = struct.Struct("!BBd")
+COMMAND_CODES = {"play": 1, "pause": 2, "seeked": 3}
+COMMAND_TYPES = {code: command_type for command_type, code in COMMAND_CODES.items()}
+
+
+def encode_command(command_type: str, timestamp: float, user_id: str) -> bytes:
+    return COMMAND_HEADER.pack(FRAME_COMMAND, COMMAND_CODES[command_type], timestamp) + user_id.encode("utf-8")
+
+
+def decode_command(frame: bytes) -> dict:
+    """Returns the command as the JSON protocol would carry it, raises ValueError on malformed frames."""
+    try:
+        frame_type, code, timestamp = COMMAND_HEADER.unpack_from(frame)
+    except struct.error as ex:
+        raise ValueError(f"Truncated command frame: {ex}") from ex
+    if frame_type != FRAME_COMMAND or code not in COMMAND_TYPES:
+        raise ValueError(f"Unknown command frame {frame_type}/{code}")
+    return {
+        "type": "command",
+        "commandType": COMMAND_TYPES[code],
+        "timestamp": timestamp,
+        "userId": frame[COMMAND_HEADER.size:].decode("utf-8"),
+    }
+
+
+def command_frame_from_json(frame: bytes) -> bytes | None:
+    """Re-encodes a relayed JSON command frame for binary clients, other frames give None."""
+    if b'"type":"command"' not in frame:
+        return None
+    data = orjson.loads(frame)
+    if data["commandType"] not in COMMAND_CODES:
+        return None
+    return encode_command(data["commandType"], float(data["timestamp"]), data["userId"])
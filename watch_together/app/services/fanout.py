@@ -0,0 +1,101 @@
+import asyncio
+from uuid import uuid4
+from typing import Callable
+
+from fastapi.logger import logger
+from redis.exceptions import ConnectionError
+
+from watch_together.app.models.sessions import Session
+from watch_together.app.services.broadcast import BroadcastEngine
+from watch_together.app.services.command_protocol import command_frame_from_json
+from watch_together.app.db.cache.abstract_cache import AbstractCacheStorage
+
+LISTEN_RETRY_DELAY = 0.05
+
+
+class RoomFanout:
+    """Relays room frames between workers through Redis pub/sub.
+
+    A worker is subscribed to a room channel only while it has local clients in
+    that room. Published frames are prefixed with the worker id, so a worker skips
+    its own frames, which were already delivered locally.
+    """
+
+    def __init__(
+        self,
+        cache_storage: AbstractCacheStorage,
+        broadcaster: BroadcastEngine,
+        on_remote_frame: Callable[[bytes, Session], None] | None = None,
+    ):
+        self.cache_storage = cache_storage
+        self.broadcaster = broadcaster
+        self.on_remote_frame = on_remote_frame
+        self.worker_id = uuid4().hex.encode("utf-8")
+        self.rooms: dict[str, Session] = {}
+        self.pubsub = None
+        self.listener: asyncio.Task | None = None
+
+    @staticmethod
+    def get_channel(session: Session) -> str:
+        return f"{session.session_id}:fanout"
+
+    async def join(self, session: Session):
+        channel = self.get_channel(session)
+        if channel in self.rooms:
+            self.rooms[channel] = session
+            return
+        if self.pubsub is None:
+            self.pubsub = self.cache_storage.pubsub()
+        await self.pubsub.subscribe(channel)
+        self.rooms[channel] = session
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen())
+        logger.info("Subscribed to room %s", session.session_id)
+
+    async def leave(self, session: Session):
+        if session.clients:
+            return
+        channel = self.get_channel(session)
+        if self.rooms.pop(channel, None) is None:
+            return
+        await self.pubsub.unsubscribe(channel)
+        logger.info("Unsubscribed from room %s", session.session_id)
+
+    async def publish(self, frame: str | bytes, session: Session):
+        if isinstance(frame, str):
+            frame = frame.encode("utf-8")
+        try:
+            await self.cache_storage.publish(self.get_channel(session), self.worker_id + frame)
+        except ConnectionError:
+            logger.error("Redis is unavailable, frame was delivered to local clients only")
+
+    async def listen(self):
+        prefix_length = len(self.worker_id)
+        try:
+            # listen() stops once every channel is unsubscribed, a room joined meanwhile restarts it
+            while self.rooms:
+                async for message in self.pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    data = message["data"]
+                    if data[:prefix_length] == self.worker_id:
+                        continue
+                    session = self.rooms.get(message["channel"].decode("utf-8"))
+                    if session is not None:
+                        frame = data[prefix_length:]
+                        await self.broadcaster.broadcast(frame, session, command_frame_from_json(frame))
+                        if self.on_remote_frame is not None:
+                            self.on_remote_frame(frame, session)
+                # the subscription of a room joined meanwhile may still be in flight, listen() would return at once
+                await asyncio.sleep(LISTEN_RETRY_DELAY)
+        except ConnectionError:
+            logger.error("Redis is unavailable, room fan-out listener stopped")
+
+    async def close(self):
+        if self.listener is not None:
+            self.listener.cancel()
+            self.listener = None
+        self.rooms.clear()
+        if self.pubsub is not None:
+            await self.pubsub.aclose()
+            self.pubsub = None
@@ -0,0 +1,131 @@
+import time
+import asyncio
+from uuid import UUID
+
+import orjson
+from fastapi import WebSocket
+from fastapi.logger import logger
+
+from watch_together.app.models.sessions import Session
+from watch_together.app.services.broadcast import BroadcastEngine
+from watch_together.app.services.state_handle import PlaybackState
+
+PING_FRAME = orjson.dumps({"type": "ping"})
+
+
+class RoomClock:
+    """Playback position of a room measured against the worker monotonic clock."""
+
+    __slots__ = ("position", "playing", "updated_at")
+
+    def __init__(self, position: float = 0.0, playing: bool = False, updated_at: float | None = None):
+        self.position = position
+        self.playing = playing
+        self.updated_at = time.monotonic() if updated_at is None else updated_at
+
+    def current_position(self, now: float) -> float:
+        if self.playing:
+            return self.position + (now - self.updated_at)
+        return self.position
+
+    def apply(self, command_type: str, timestamp: float, now: float):
+        self.position = timestamp
+        self.updated_at = now
+        if command_type in ["play", "pause"]:
+            self.playing = command_type == "play"
+
+
+class PlaybackClock:
+    """Keeps playing rooms in sync with periodic drift-correction ticks.
+
+    Every tick each client of a playing room gets a ping and the room position
+    advanced by half of the client round trip time, measured from its last pong.
+    """
+
+    def __init__(self, broadcaster: BroadcastEngine, tick_interval: float):
+        self.broadcaster = broadcaster
+        self.tick_interval = tick_interval
+        self.rooms: dict[UUID, tuple[Session, RoomClock]] = {}
+        self.pings: dict[int, float] = {}
+        self.rtts: dict[int, float] = {}
+        self.task: asyncio.Task | None = None
+        # Evicted sockets must not leave RTT entries behind for a later socket reusing the same id()
+        broadcaster.add_evict_hook(self.forget_client)
+
+    def sync_room(self, session: Session, video_state: PlaybackState | None):
+        """Creates the room clock from the cached state when the room gets its first local client."""
+        if session.session_id in self.rooms:
+            return
+        now = time.monotonic()
+        clock = RoomClock(updated_at=now)
+        if video_state is not None:
+            clock.playing = video_state.command_type == "play"
+            clock.position = video_state.current_position(time.time())
+        self.rooms[session.session_id] = (session, clock)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def apply_command(self, session: Session, command_type: str, timestamp: float):
+        room = self.rooms.get(session.session_id)
+        if room is not None:
+            room[1].apply(command_type, float(timestamp), time.monotonic())
+
+    def room_state(self, session: Session) -> dict | None:
+        """Current playback state of the room in the snapshot `state` shape, None for an unknown room."""
+        room = self.rooms.get(session.session_id)
+        if room is None:
+            return None
+        clock = room[1]
+        return {
+            "commandType": "play" if clock.playing else "pause",
+            "timestamp": clock.current_position(time.monotonic()),
+        }
+
+    def apply_frame(self, frame: bytes, session: Session):
+        """Follows commands relayed from other workers."""
+        if b'"type":"command"' not in frame:
+            return
+        data = orjson.loads(frame)
+        self.apply_command(session, data["commandType"], data["timestamp"])
+
+    def handle_pong(self, websocket: WebSocket):
+        sent_at = self.pings.pop(id(websocket), None)
+        if sent_at is not None:
+            rtt = time.monotonic() - sent_at
+            previous = self.rtts.get(id(websocket))
+            self.rtts[id(websocket)] = rtt if previous is None else previous * 0.8 + rtt * 0.2
+
+    def forget_client(self, session: Session, websocket: WebSocket):
+        self.pings.pop(id(websocket), None)
+        self.rtts.pop(id(websocket), None)
+        if not session.clients:
+            self.rooms.pop(session.session_id, None)
+
+    async def run(self):
+        while self.rooms:
+            await asyncio.sleep(self.tick_interval)
+            try:
+                await self.tick()
+            except Exception as ex:
+                logger.error("Playback clock tick failed: %s", ex)
+
+    async def tick(self):
+        now = time.monotonic()
+        for session, clock in list(self.rooms.values()):
+            if not clock.playing:
+                continue
+            position = clock.current_position(now)
+            for client in list(session.clients):
+                offset = self.rtts.get(id(client), 0.0) / 2
+                await self.broadcaster.send(
+                    orjson.dumps({"type": "tick", "timestamp": position + offset}), session, client
+                )
+                if id(client) not in self.broadcaster.channels:
+                    continue
+                self.pings[id(client)] = now
+                await self.broadcaster.send(PING_FRAME, session, client)
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
@@ -0,0 +1,64 @@
+import asyncio
+from uuid import UUID
+
+from fastapi.logger import logger
+from redis.exceptions import ConnectionError
+
+from watch_together.app.models.sessions import Session
+from watch_together.app.db.cache.abstract_cache import AbstractCacheStorage
+
+
+class RoomPresence:
+    """Counts the clients of each session across all workers in Redis.
+
+    `session.clients` only holds the clients of this worker. The counters expire,
+    so the counts of a crashed worker do not pin a session forever, and every
+    worker keeps refreshing the counters of its rooms while they have clients.
+    A worker only takes back the increments that reached Redis, so a join made
+    during an outage cannot push the counter below the real number of clients.
+    """
+
+    def __init__(self, cache_storage: AbstractCacheStorage, ttl: int):
+        self.cache_storage = cache_storage
+        self.ttl = ttl
+        self.rooms: dict[UUID, Session] = {}
+        self.counted: dict[UUID, int] = {}
+        self.task: asyncio.Task | None = None
+
+    @staticmethod
+    def get_key(session: Session) -> str:
+        return f"{session.session_id}:presence"
+
+    async def join(self, session: Session) -> int:
+        self.rooms[session.session_id] = session
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        viewers = await self.cache_storage.incrby(self.get_key(session), 1, self.ttl)
+        self.counted[session.session_id] = self.counted.get(session.session_id, 0) + 1
+        return viewers
+
+    async def leave(self, session: Session) -> int:
+        if not session.clients:
+            self.rooms.pop(session.session_id, None)
+        counted = self.counted.pop(session.session_id, 0)
+        if not counted:
+            return int(await self.cache_storage.get(self.get_key(session)) or 0)
+        if counted > 1:
+            self.counted[session.session_id] = counted - 1
+        return await self.cache_storage.incrby(self.get_key(session), -1, self.ttl)
+
+    async def run(self):
+        while self.rooms:
+            await asyncio.sleep(self.ttl / 3)
+            keys = [self.get_key(session) for session in self.rooms.values() if session.clients]
+            try:
+                await self.cache_storage.expire_many(keys, self.ttl)
+            except ConnectionError:
+                logger.error("Redis is unavailable, presence counters were not refreshed")
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+        self.rooms.clear()
+        self.counted.clear()
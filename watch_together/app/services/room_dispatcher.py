@@ -0,0 +1,115 @@
+import asyncio
+from uuid import UUID
+from typing import Awaitable, Callable
+
+from fastapi import WebSocket
+from fastapi.logger import logger
+
+from watch_together.app.models.sessions import Session
+from watch_together.app.utils.metrics import registry
+
+MessageHandler = Callable[[dict, Session, WebSocket], Awaitable[None]]
+Job = Callable[[], Awaitable[None]]
+
+INBOX_OVERFLOWS = registry.counter(
+    "watch_together_inbox_overflows_total", "Clients disconnected because their inbox stayed full"
+)
+
+
+class Inbox:
+    """Frames read from one websocket and not yet processed."""
+
+    __slots__ = ("session", "websocket", "frames")
+
+    def __init__(self, session: Session, websocket: WebSocket, size: int):
+        self.session = session
+        self.websocket = websocket
+        self.frames: asyncio.Queue = asyncio.Queue(maxsize=size)
+
+
+class Room:
+    __slots__ = ("inboxes", "ready", "task")
+
+    def __init__(self):
+        self.inboxes: dict[int, Inbox] = {}
+        # One entry per queued frame or posted job, in arrival order across the room
+        self.ready: asyncio.Queue = asyncio.Queue()
+        self.task: asyncio.Task | None = None
+
+
+class RoomDispatcher:
+    """Processes the frames of a room one at a time, apart from the socket readers.
+
+    Readers only put frames into their connection inbox, so a slow broadcast or
+    a Redis hiccup never stops a socket from being read. A full inbox pushes
+    back on its reader for up to `put_timeout` seconds, after that the frame is
+    refused and the caller is expected to drop the connection.
+    """
+
+    def __init__(self, handler: MessageHandler, inbox_size: int, put_timeout: float):
+        self.handler = handler
+        self.inbox_size = inbox_size
+        self.put_timeout = put_timeout
+        self.rooms: dict[UUID, Room] = {}
+
+    def open(self, session: Session, websocket: WebSocket):
+        room = self.rooms.get(session.session_id)
+        if room is None:
+            room = self.rooms[session.session_id] = Room()
+            room.task = asyncio.create_task(self.run(session, room))
+        room.inboxes[id(websocket)] = Inbox(session, websocket, self.inbox_size)
+
+    def close(self, session: Session, websocket: WebSocket):
+        """Frames already queued by the client are still processed.
+
+        The room stays registered until its task drained the queue, a client
+        joining meanwhile is served by the same task.
+        """
+        room = self.rooms.get(session.session_id)
+        if room is None or room.inboxes.pop(id(websocket), None) is None:
+            return
+        if not room.inboxes:
+            room.ready.put_nowait(None)
+
+    async def submit(self, data: dict, session: Session, websocket: WebSocket) -> bool:
+        room = self.rooms.get(session.session_id)
+        inbox = room.inboxes.get(id(websocket)) if room is not None else None
+        if inbox is None:
+            return False
+        try:
+            await asyncio.wait_for(inbox.frames.put(data), timeout=self.put_timeout)
+        except asyncio.TimeoutError:
+            INBOX_OVERFLOWS.inc()
+            return False
+        room.ready.put_nowait(inbox)
+        return True
+
+    def post(self, session: Session, job: Job) -> bool:
+        """Runs `job` in the room order, after the frames already queued. False when the room is closed."""
+        room = self.rooms.get(session.session_id)
+        if room is None or not room.inboxes:
+            return False
+        room.ready.put_nowait(job)
+        return True
+
+    async def run(self, session: Session, room: Room):
+        while True:
+            item = await room.ready.get()
+            if item is None:
+                if room.inboxes:
+                    # The room was left and joined again before the drain finished
+                    continue
+                del self.rooms[session.session_id]
+                return
+            try:
+                if isinstance(item, Inbox):
+                    await self.handler(item.frames.get_nowait(), item.session, item.websocket)
+                else:
+                    await item()
+            except Exception as ex:
+                logger.error("Could not process frame in session %s: %s", session.session_id, ex)
+
+    async def stop(self):
+        for room in self.rooms.values():
+            room.task.cancel()
+        self.rooms.clear()
@@ -0,0 +1,86 @@
+import asyncio
+from uuid import UUID
+from collections import OrderedDict
+
+from fastapi.logger import logger
+
+from watch_together.app.models.sessions import Session
+
+
+class SessionRegistry:
+    """In-memory rooms of the worker, kept only while they are in use.
+
+    Every connected websocket holds a reference on its room. A room nobody
+    references is evicted after the idle grace period, and once the registry
+    exceeds `max_rooms` the least recently used unreferenced rooms go first.
+    Evicted rooms are reloaded from Mongo on the next lookup.
+    """
+
+    def __init__(self, max_rooms: int, idle_grace: float):
+        self.max_rooms = max_rooms
+        self.idle_grace = idle_grace
+        self.rooms: OrderedDict[UUID, Session] = OrderedDict()
+        self.refs: dict[UUID, int] = {}
+        self.idle_timers: dict[UUID, asyncio.TimerHandle] = {}
+
+    def __len__(self) -> int:
+        return len(self.rooms)
+
+    def get(self, session_id: UUID) -> Session | None:
+        session = self.rooms.get(session_id)
+        if session is not None:
+            self.rooms.move_to_end(session_id)
+        return session
+
+    def add(self, session: Session) -> Session:
+        self.rooms[session.session_id] = session
+        self.rooms.move_to_end(session.session_id)
+        if not self.refs.get(session.session_id):
+            self.schedule_eviction(session.session_id)
+        self.evict_overflow()
+        return session
+
+    def acquire(self, session: Session):
+        """Pins the room for a new client, re-adding it if it was evicted meanwhile."""
+        self.refs[session.session_id] = self.refs.get(session.session_id, 0) + 1
+        self.cancel_eviction(session.session_id)
+        if session.session_id not in self.rooms:
+            self.add(session)
+
+    def release(self, session: Session):
+        refs = self.refs.get(session.session_id, 0) - 1
+        if refs > 0:
+            self.refs[session.session_id] = refs
+            return
+        self.refs.pop(session.session_id, None)
+        self.schedule_eviction(session.session_id)
+
+    def evict(self, session_id: UUID):
+        self.cancel_eviction(session_id)
+        if self.rooms.pop(session_id, None) is not None:
+            logger.debug("Evicted idle session %s", session_id)
+
+    def evict_overflow(self):
+        if len(self.rooms) <= self.max_rooms:
+            return
+        for session_id in [session_id for session_id in self.rooms if not self.refs.get(session_id)]:
+            self.evict(session_id)
+            if len(self.rooms) <= self.max_rooms:
+                return
+        logger.warning("Session registry holds %s rooms in use, above the limit of %s", len(self.rooms), self.max_rooms)
+
+    def schedule_eviction(self, session_id: UUID):
+        self.cancel_eviction(session_id)
+        self.idle_timers[session_id] = asyncio.get_running_loop().call_later(self.idle_grace, self.evict, session_id)
+
+    def cancel_eviction(self, session_id: UUID):
+        timer = self.idle_timers.pop(session_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def clear(self):
+        for timer in self.idle_timers.values():
+            timer.cancel()
+        self.rooms.clear()
+        self.refs.clear()
+        self.idle_timers.clear()
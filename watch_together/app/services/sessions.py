@@ -1,36 +1,70 @@
 from uuid import UUID
+from itertools import islice
+from datetime import datetime, timezone
 
 from fastapi import HTTPException, status
 from fastapi.logger import logger
-from pymongo.errors import ServerSelectionTimeoutError
+from pymongo.errors import ServerSelectionTimeoutError, PyMongoError
 
+from watch_together.app.config import settings
 from watch_together.app.models import Session
+from watch_together.app.services.session_registry import SessionRegistry
+from watch_together.app.utils.ttl_cache import AsyncTTLCache
 from watch_together.app.db.provider import get_session_storage
 from watch_together.app.api.v1.sessions.schemas import CreateSession
 
-active_sessions = {}
+active_sessions = SessionRegistry(settings.max_active_sessions, settings.session_idle_grace)
+session_lookups = AsyncTTLCache(settings.missing_session_ttl, settings.max_active_sessions)
 
 
 async def get_active_sessions():
-    return active_sessions
+    return active_sessions.rooms
+
+
+def get_active_sessions_page(offset: int, limit: int) -> tuple[int, list[Session]]:
+    """Slices the active sessions without copying the whole registry."""
+    return len(active_sessions), list(islice(active_sessions.rooms.values(), offset, offset + limit))
 
 
 async def add_active_session(session: Session):
-    active_sessions[session.session_id] = session
+    active_sessions.add(session)
+
 
+async def get_session(session_id: UUID) -> Session | None:
+    """Reads through the registry to Mongo, concurrent misses for one id share a single query.
 
-async def get_session(session_id: UUID) -> Session | str:
+    Ids missing from Mongo are remembered for a short while, so bad links and
+    reconnect loops do not reach the database on every attempt.
+    """
     logger.info("Get session with id: %s", session_id)
-    session = active_sessions.get(session_id, None)
-    if not session:
-        storage = get_session_storage()
-        session = await storage.get_session(session_id)
+    session = active_sessions.get(session_id)
+    if session is None:
+        session = await session_lookups.get_or_load(session_id, lambda: load_session(session_id))
+        if session is not None:
+            # Found rooms live in the registry, only negative entries stay in the lookup cache
+            session_lookups.invalidate(session_id)
     return session
 
 
+async def load_session(session_id: UUID) -> Session | None:
+    storage = get_session_storage()
+    document = await storage.get_session(session_id)
+    if document is None:
+        return None
+    return active_sessions.get(session_id) or active_sessions.add(Session.model_validate(document))
+
+
+def acquire_session(session: Session):
+    active_sessions.acquire(session)
+
+
+def release_session(session: Session):
+    active_sessions.release(session)
+
+
 async def create_session(session_data: CreateSession, friends: list) -> Session:
     logger.info("Create new Session")
-    session = Session(participants=session_data.selected_participants, friends=friends, movie_id=session_data.movie_id)
+    session = Session(participant=session_data.selected_participants, friends=friends, movie_id=session_data.movie_id)
     storage = get_session_storage()
     try:
         await storage.save_session(session)
@@ -41,3 +75,37 @@ async def create_session(session_data: CreateSession, friends: list) -> Session:
     logger.debug("Session with id: %s created", session.session_id)
     await add_active_session(session)
     return session
+
+
+async def mark_session_active(session: Session, viewers: int | None):
+    """The first client across all workers reopens the session, another worker may have finished it.
+
+    Without a presence count only a session finished by this worker is reopened.
+    """
+    if viewers != 1 and session.finished_at is None:
+        return
+    session.finished_at = None
+    storage = get_session_storage()
+    try:
+        await storage.reopen_session(session.session_id)
+    except PyMongoError as ex:
+        logger.error("Could not reopen session %s: %s", session.session_id, ex)
+
+
+async def mark_session_finished(session: Session, viewers: int | None):
+    """Starts the TTL countdown of a session which has no clients left on any worker.
+
+    Without a presence count, Redis being unavailable, only the clients of this
+    worker are known.
+    """
+    if viewers is None:
+        if session.clients or session.finished_at is not None:
+            return
+    elif viewers > 0:
+        return
+    session.finished_at = datetime.now(timezone.utc)
+    storage = get_session_storage()
+    try:
+        await storage.finish_session(session.session_id, session.finished_at)
+    except PyMongoError as ex:
+        logger.error("Could not finish session %s: %s", session.session_id, ex)
@@ -1,74 +1,106 @@
+import time
 from datetime import datetime
+from typing import NamedTuple
 
+import orjson
 from fastapi import WebSocket
 from fastapi.logger import logger
 from redis.exceptions import ConnectionError
 
+from watch_together.app.config import get_settings, Settings
 from watch_together.app.models.sessions import Session
 from watch_together.app.db.cache.abstract_cache import AbstractCacheStorage
-from watch_together.app.api.v1.sessions.schemas import CommandResponse, MessageResponse
 
 
-class StateHandler:
+class PlaybackState(NamedTuple):
+    """Playback state of a room, `action_time` is the epoch time the position was recorded at."""
 
-    def __init__(self, cache_storage: AbstractCacheStorage):
-        self.cache_storage = cache_storage
+    command_type: str
+    timestamp: float
+    action_time: float | None
 
-    async def handle_video_state(self, session: Session, websocket: WebSocket):
-        key = f"{session.session_id}:command"
-        try:
-            video_state = await self.cache_storage.hvals(key)
-        except ConnectionError:
-            logger.error("Redis is unavailable")
-            return None, None
+    # `timestamp_action` is the pre-epoch field holding `str(datetime.now())`, read while old states live in Redis
+    FIELDS = ("commandType", "timestamp", "action_time", "timestamp_action")
+    LEGACY_ACTION_TIME_FORMAT = "%Y-%m-%d %H:%M:%S.%f"
 
-        if video_state:
-            response_timestamp, response_status = await self.process_video_state(video_state, session, websocket)
-            return response_timestamp, response_status
-        return None, None
-
-    async def process_video_state(self, video_state: list, session: Session, websocket: WebSocket):
-        command_type = video_state[0].decode("utf-8")
-        timestamp = float(video_state[1].decode("utf-8"))
-        timestamp_action = video_state[2].decode("utf-8")
+    @classmethod
+    def from_values(cls, values: list) -> "PlaybackState | None":
+        command_type, timestamp, action_time, legacy_action_time = values
+        if command_type is None and timestamp is None:
+            return None
+        if action_time is not None:
+            action_time = float(action_time)
+        elif legacy_action_time is not None:
+            action_time = cls.parse_legacy_action_time(legacy_action_time)
+        return cls(
+            command_type=command_type.decode("utf-8") if command_type is not None else "pause",
+            timestamp=float(timestamp) if timestamp is not None else 0.0,
+            action_time=action_time,
+        )
+
+    @classmethod
+    def parse_legacy_action_time(cls, value: bytes) -> float | None:
+        try:
+            return datetime.strptime(value.decode("utf-8"), cls.LEGACY_ACTION_TIME_FORMAT).timestamp()
+        except ValueError:
+            logger.warning("Unparsable legacy timestamp_action %r", value)
+            return None
 
-        current_time = datetime.now()
-        delta = (current_time - datetime.strptime(timestamp_action, "%Y-%m-%d %H:%M:%S.%f")).total_seconds()
-        if command_type == "play":
-            timestamp = timestamp + delta
+    def current_position(self, now: float) -> float:
+        if self.command_type == "play" and self.action_time is not None:
+            return self.timestamp + (now - self.action_time)
+        return self.timestamp
 
-        response_timestamp = CommandResponse(commandType="seeked", timestamp=timestamp)
-        response_status = CommandResponse(commandType=command_type)
 
-        return response_timestamp, response_status
+class StateHandler:
 
-    async def handle_chat_state(self, session: Session, websocket: WebSocket):
-        key = f"{session.session_id}:message"
+    def __init__(self, cache_storage: AbstractCacheStorage, settings: Settings = get_settings()):
+        self.cache_storage = cache_storage
+        self.chat_history_depth = settings.chat_history_depth
+        self.state_ttl = settings.session_state_ttl
+
+    async def handle_join_snapshot(
+        self, session: Session, websocket: WebSocket
+    ) -> tuple[PlaybackState | None, bytes | None]:
+        command_key = f"{session.session_id}:command"
+        message_key = f"{session.session_id}:message"
         try:
-            chat_state = await self.cache_storage.lrange(key, -10, -1)
+            video_values, chat_state = await self.cache_storage.hmget_lrange(
+                command_key, PlaybackState.FIELDS, message_key, -self.chat_history_depth, -1
+            )
         except ConnectionError:
             logger.error("Redis is unavailable")
-            return None
-        if chat_state:
-            return await self.process_chat_state(chat_state, session, websocket)
-        return None
-
-    async def process_chat_state(self, chat_state: list, session: Session, websocket: WebSocket):
-        return [message.decode("utf-8") for message in chat_state]
-
-    async def save_message_to_cache(self, session: Session, response: MessageResponse):
+            return None, None
+        video_state = PlaybackState.from_values(video_values)
+        return video_state, await self.process_join_snapshot(video_state, chat_state, session, websocket)
+
+    async def process_join_snapshot(
+        self, video_state: PlaybackState | None, chat_state: list, session: Session, websocket: WebSocket
+    ) -> bytes:
+        state = None
+        if video_state is not None:
+            state = {
+                "commandType": video_state.command_type,
+                "timestamp": video_state.current_position(time.time()),
+            }
+        # Cached messages are already encoded frames, so they are spliced in without re-encoding
+        return b'{"type":"snapshot","state":' + orjson.dumps(state) + b',"messages":[' + b",".join(chat_state) + b"]}"
+
+    async def save_message_to_cache(self, session: Session, frame: bytes):
         key = f"{session.session_id}:message"
-        await self.cache_storage.rpush(key, response.json())
+        await self.cache_storage.rpush_capped(key, frame, self.chat_history_depth, self.state_ttl)
 
     async def save_command_to_cache(self, session: Session, data: dict):
         key = f"{session.session_id}:command"
         timestamp = data["timestamp"]
         command_type = data["commandType"]
-        timestamp_action = str(datetime.now())
+        action_time = time.time()
 
         if command_type in ["play", "pause"]:
-            await self.cache_storage.hset(key, "commandType", command_type)
-            await self.cache_storage.hset(key, "timestamp", timestamp)
-            await self.cache_storage.hset(key, "timestamp_action", timestamp_action)
+            state = {"commandType": command_type, "timestamp": timestamp, "action_time": action_time}
         elif command_type == "seeked":
-            await self.cache_storage.hset(key, "timestamp", timestamp)
+            # The position is measured from the seek moment, otherwise a playing video drifts on join
+            state = {"timestamp": timestamp, "action_time": action_time}
+        else:
+            return
+        await self.cache_storage.hset_mapping(key, state, self.state_ttl)
@@ -1,57 +1,124 @@
-import json
+import logging
 from uuid import uuid4
 from datetime import datetime
 
+import orjson
 from fastapi import WebSocket, HTTPException, status
 from fastapi.logger import logger
 from redis.exceptions import ConnectionError
 
+from watch_together.app.config import settings
+from watch_together.app.utils.log_util import log_sampled
+from watch_together.app.services.fanout import RoomFanout
+from watch_together.app.services.presence import RoomPresence
+from watch_together.app.services.playback_clock import PlaybackClock
+from watch_together.app.services.command_coalescer import CommandCoalescer
+from watch_together.app.services.broadcast import BroadcastEngine, encode_frame
+from watch_together.app.services.command_protocol import SUBPROTOCOL, COMMAND_CODES, encode_command
 from watch_together.app.services.state_handle import StateHandler
+from watch_together.app.services.room_dispatcher import RoomDispatcher
 from watch_together.app.models.sessions import Session
-from watch_together.app.api.v1.sessions.schemas import AuthorResponse, MessageResponse
 from watch_together.app.db.cache.redis_cache import AbstractCacheStorage
 
 
 class ConnectionManager:
 
-    def __init__(self, cache_storage: AbstractCacheStorage):
+    def __init__(self, cache_storage: AbstractCacheStorage, broadcaster: BroadcastEngine):
         self.cache_storage = cache_storage
         self.state_handler = StateHandler(cache_storage)
+        self.broadcaster = broadcaster
+        self.clock = PlaybackClock(broadcaster, settings.playback_tick_interval)
+        self.fanout = RoomFanout(cache_storage, broadcaster, on_remote_frame=self.clock.apply_frame)
+        self.presence = RoomPresence(cache_storage, settings.presence_ttl)
+        self.dispatcher = RoomDispatcher(self.handle_message, settings.inbox_size, settings.inbox_put_timeout)
+        self.coalescer = CommandCoalescer(
+            self.dispatch_command,
+            self.reject_command,
+            self.dispatcher.post,
+            settings.seek_coalesce_window,
+            settings.command_rate_per_user,
+            settings.command_burst_per_user,
+        )
+
+    async def connect(self, session: Session, websocket: WebSocket) -> int | None:
+        """Returns the number of clients of the session across all workers, None when Redis is unavailable."""
+        subprotocol = SUBPROTOCOL if SUBPROTOCOL in websocket.scope.get("subprotocols", []) else None
+        await websocket.accept(subprotocol=subprotocol)
+        self.broadcaster.register(session, websocket, binary=subprotocol is not None)
+        self.dispatcher.open(session, websocket)
+        logger.info("New client in session %s", session.session_id)
 
-    async def connect(self, session: Session, websocket: WebSocket):
-        await websocket.accept()
-        session.clients.append(websocket)
-        logger.info(f"New client: {websocket}")
+        try:
+            viewers = await self.join_room(session)
+            video_state, snapshot = await self.state_handler.handle_join_snapshot(session, websocket)
+            self.clock.sync_room(session, video_state)
+            if snapshot is not None:
+                await self.send_personal_message(snapshot, session, websocket)
+        except BaseException:
+            # The endpoint only disconnects clients which joined, so a failed join is undone here
+            await self.disconnect(session, websocket, status.WS_1011_INTERNAL_ERROR)
+            raise
+        return viewers
 
+    async def join_room(self, session: Session) -> int | None:
+        """A Redis outage leaves the room served to the clients of this worker only."""
+        viewers = None
         try:
-            response_timestamp, response_status = await self.state_handler.handle_video_state(session, websocket)
-            logger.info(f"Response timestamp: {response_timestamp}. Response status: {response_status}")
-            if response_timestamp is not None and response_status is not None:
-                await self.send_personal_message(response_timestamp.json(), session, websocket)
-                await self.send_personal_message(response_status.json(), session, websocket)
-
-            chat_state = await self.state_handler.handle_chat_state(session, websocket)
-            logger.info(f"Chat state: {chat_state}.")
-            if chat_state is not None:
-                for message in chat_state:
-                    await self.send_personal_message(message, session, websocket)
+            viewers = await self.presence.join(session)
         except ConnectionError:
-            logger.error("Redis is unavailable")
-            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Redis is unavailable")
+            logger.error("Redis is unavailable, presence of session %s was not updated", session.session_id)
+        try:
+            await self.fanout.join(session)
+        except ConnectionError:
+            logger.error("Redis is unavailable, session %s gets no frames from other workers", session.session_id)
+        return viewers
+
+    async def disconnect(
+        self, session: Session, websocket: WebSocket, code: int = status.WS_1000_NORMAL_CLOSURE
+    ) -> int | None:
+        """Returns the number of clients left across all workers, None when Redis is unavailable."""
+        self.dispatcher.close(session, websocket)
+        await self.broadcaster.evict(session, websocket, code)
+        try:
+            await self.fanout.leave(session)
+        except ConnectionError:
+            logger.error("Redis is unavailable, session %s was not unsubscribed", session.session_id)
+        self.coalescer.forget_room(session)
+        logger.info("Client left session %s", session.session_id)
+        try:
+            return await self.presence.leave(session)
+        except ConnectionError:
+            logger.error("Redis is unavailable, presence of session %s was not updated", session.session_id)
+            return None
 
-    async def disconnect(self, session: Session, websocket: WebSocket):
-        session.clients.remove(websocket)
-        await websocket.close()
-        logger.info(f"Client disconnect: {websocket}")
+    async def close(self):
+        """Stops the background tasks of the worker, called on application shutdown."""
+        await self.dispatcher.stop()
+        self.coalescer.close()
+        await self.clock.stop()
+        await self.fanout.close()
+        await self.presence.stop()
+        await self.broadcaster.close()
 
-    async def send_personal_message(self, message: str, session: Session, websocket: WebSocket):
-        await websocket.send_text(message)
-        logger.info(f"Sent message to: {websocket}")
+    async def send_personal_message(self, message: str | bytes, session: Session, websocket: WebSocket):
+        await self.broadcaster.send(message, session, websocket)
 
-    async def broadcast(self, message: str, session: Session, websocket: WebSocket):
-        for client in session.clients:
-            await client.send_text(message)
-            logger.info(f"sent broadcast message to: {client}")
+    async def broadcast(
+        self, message: str | bytes, session: Session, websocket: WebSocket, binary_message: bytes | None = None
+    ):
+        await self.broadcaster.broadcast(message, session, binary_message)
+        await self.fanout.publish(message, session)
+        log_sampled(
+            logger, logging.INFO, "Broadcast frame", session_id=str(session.session_id), clients=len(session.clients)
+        )
+
+    async def submit(self, data: dict, session: Session, websocket: WebSocket) -> bool:
+        """Queues a frame for the room dispatcher, False means the client inbox overflowed."""
+        if data.get("type") == "pong":
+            # Answered at once, a queued pong would inflate the measured round trip
+            self.clock.handle_pong(websocket)
+            return True
+        return await self.dispatcher.submit(data, session, websocket)
 
     async def handle_message(self, data: dict, session: Session, websocket: WebSocket):
         message_type = data.get("type")
@@ -59,29 +126,49 @@ class ConnectionManager:
             await self.handle_message_chat(data, session, websocket)
         elif message_type == "command":
             await self.handle_message_command(data, session, websocket)
+        elif message_type == "pong":
+            self.clock.handle_pong(websocket)
 
     async def handle_message_chat(self, data: dict, session: Session, websocket: WebSocket):
-        author_message = next((friend for friend in session.friends if friend["id"] == data["author_id"]), None)
-        name = f"{author_message['first_name']} {author_message['last_name']}"
-        author_response = AuthorResponse(id=data["author_id"], name=name)
-        response = MessageResponse(
-            author=author_response, message=data["message"], id=uuid4(), timestamp=str(datetime.now())
-        )
-        await self.broadcast(response.json(), session, websocket)
+        author = session.get_author(data["author_id"])
+        if author is None:
+            logger.warning("Message from unknown author %s in session %s", data["author_id"], session.session_id)
+            return
+        message = {"message": data["message"], "id": str(uuid4()), "type": "message", "timestamp": str(datetime.now())}
+        # Splice the cached author fragment into the encoded message, the frame matches MessageResponse
+        frame = b'{"author":' + author + b"," + orjson.dumps(message)[1:]
+        await self.broadcast(frame, session, websocket)
         try:
-            await self.state_handler.save_message_to_cache(session, response)
+            await self.state_handler.save_message_to_cache(session, frame)
         except ConnectionError:
             logger.error("Redis is unavailable")
             raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Redis is unavailable")
 
     async def handle_message_command(self, data: dict, session: Session, websocket: WebSocket):
+        await self.coalescer.submit(data, session, websocket)
+
+    async def reject_command(self, data: dict, session: Session, websocket: WebSocket):
+        """Tells the sender its command was dropped and where the room playback actually is."""
+        response = {
+            "type": "rejected",
+            "reason": "rate_limited",
+            "commandType": data["commandType"],
+            "state": self.clock.room_state(session),
+        }
+        await self.send_personal_message(encode_frame(response), session, websocket)
+
+    async def dispatch_command(self, data: dict, session: Session, websocket: WebSocket):
         response = {
             "userId": data["userId"],
             "type": data["type"],
             "commandType": data["commandType"],
             "timestamp": data["timestamp"],
         }
-        await self.broadcast(json.dumps(response), session, websocket)
+        binary_frame = None
+        if data["commandType"] in COMMAND_CODES:
+            binary_frame = encode_command(data["commandType"], float(data["timestamp"]), data["userId"])
+        await self.broadcast(encode_frame(response), session, websocket, binary_frame)
+        self.clock.apply_command(session, data["commandType"], data["timestamp"])
         try:
             await self.state_handler.save_command_to_cache(session, data)
         except ConnectionError:
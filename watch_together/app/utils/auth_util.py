@@ -1,3 +1,5 @@
+import hashlib
+
 import httpx
 from fastapi import Depends, HTTPException, status
 from fastapi.logger import logger
@@ -5,33 +7,63 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from watch_together.app.config import settings
 from watch_together.app.api.v1.sessions.schemas import AuthUserResponse
+from watch_together.app.utils.ttl_cache import AsyncTTLCache
 
 oauth2_scheme = HTTPBearer()
 
+http_client: httpx.AsyncClient | None = None
+
+verified_users = AsyncTTLCache(ttl=settings.auth_cache_ttl, max_size=settings.auth_cache_size)
+user_friends = AsyncTTLCache(ttl=settings.auth_cache_ttl, max_size=settings.auth_cache_size)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the process-wide client, so auth calls reuse pooled keep-alive connections."""
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=settings.auth_max_connections))
+    return http_client
+
+
+async def close_http_client():
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
+
+def get_token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def request_auth_service(url: str, token: str):
+    headers = {"Authorization": f"Bearer {token}"}
+    response = await get_http_client().get(url=url, headers=headers)
+    response.raise_for_status()
+    return response.json()
+
 
 async def get_current_user(auth_credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)):
+    token = auth_credentials.credentials
     try:
-        async with httpx.AsyncClient() as client:
-            url = settings.verify_token_url
-            headers = {"Authorization": f"Bearer {auth_credentials.credentials}"}
-            response = await client.get(url=url, headers=headers)
-            auth_user_data = response.json()
-            user_data = AuthUserResponse(**auth_user_data)
-            logger.info("User authenticated successfully: %s", user_data.username)
-            return user_data
+        auth_user_data = await verified_users.get_or_load(
+            get_token_digest(token), lambda: request_auth_service(settings.verify_token_url, token)
+        )
+        user_data = AuthUserResponse(**auth_user_data)
+        logger.info("User authenticated successfully: %s", user_data.username)
+        return user_data
     except httpx.HTTPError:
         logger.error("Could not validate credentials")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
 
 
 async def get_user_friends(auth_credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme)):
+    token = auth_credentials.credentials
     try:
-        async with httpx.AsyncClient() as client:
-            url = settings.get_user_friends_url
-            headers = {"Authorization": f"Bearer {auth_credentials.credentials}"}
-            response = await client.get(url, headers=headers)
-            friends_list = response.json()
-            return friends_list
+        friends_list = await user_friends.get_or_load(
+            get_token_digest(token), lambda: request_auth_service(settings.get_user_friends_url, token)
+        )
+        return friends_list
     except httpx.HTTPError:
         logger.error("Could not validate credentials")
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
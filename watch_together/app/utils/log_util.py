@@ -0,0 +1,61 @@
+import copy
+import queue
+import atexit
+import random
+import logging
+from logging.handlers import QueueHandler, QueueListener
+
+from pythonjsonlogger import jsonlogger
+
+queue_listener: QueueListener | None = None
+sample_rate = 1.0
+exception_formatter = logging.Formatter()
+
+
+class LazyQueueHandler(QueueHandler):
+    """Queues records unformatted, the stock handler formats them in the logging thread.
+
+    Only the parts which may change or can not be shared with the thread are
+    resolved here: the message args and the exception traceback.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def log_sampled(logger: logging.Logger, level: int, msg: str, *args, **fields):
+    """Logs a share of hot-path events, skipped calls build neither the record nor its extra fields."""
+    if random.random() < sample_rate and logger.isEnabledFor(level):
+        logger.log(level, msg, *args, extra=fields)
+
+
+def configure_logging(logger: logging.Logger, level: str, rate: float):
+    """Moves record output off the event loop, handlers run in the queue listener thread.
+
+    Records are formatted only in the listener thread. Calling it again keeps the
+    handlers installed by the first call.
+    """
+    global queue_listener, sample_rate
+    logger.setLevel(level)
+    sample_rate = rate
+    if queue_listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(jsonlogger.JsonFormatter("%(name)s %(lineno)d %(levelname)s %(message)s"))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    logger.addHandler(queue_handler)
+
+    queue_listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    queue_listener.start()
+    # Flushes the records still queued on interpreter exit
+    atexit.register(queue_listener.stop)
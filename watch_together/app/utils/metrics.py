@@ -0,0 +1,141 @@
+import time
+from functools import wraps
+from typing import Callable, Iterable
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+LabelValues = tuple[tuple[str, str], ...]
+
+
+def format_labels(labels: LabelValues, extra: str = "") -> str:
+    parts = [f'{name}="{value}"' for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{format_labels(labels)} {value}"
+
+
+class Gauge:
+    """Gauge read at scrape time, the callback returns a value or (labels, value) pairs."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, callback: Callable[[], float | list[tuple[dict, float]]]):
+        self.name = name
+        self.description = description
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        value = self.callback()
+        if not isinstance(value, list):
+            value = [({}, value)]
+        for labels, sample in value:
+            yield f"{self.name}{format_labels(tuple(sorted(labels.items())))} {sample}"
+
+
+class CallbackCounter(Gauge):
+    """Counter kept elsewhere, e.g. by a driver, and read at scrape time. The values must never decrease."""
+
+    kind = "counter"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.values: dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        state = self.values.get(key)
+        if state is None:
+            # Per-bucket counts, then the overall count and sum
+            state = self.values[key] = [0] * len(self.buckets) + [0, 0.0]
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[index] += 1
+                break
+        state[-2] += 1
+        state[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, state in self.values.items():
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += state[index]
+                bucket_labels = format_labels(labels, 'le="%s"' % bound)
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            bucket_labels = format_labels(labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{bucket_labels} {state[-2]}"
+            yield f"{self.name}_count{format_labels(labels)} {state[-2]}"
+            yield f"{self.name}_sum{format_labels(labels)} {state[-1]}"
+
+
+class MetricsRegistry:
+    """Minimal registry rendering the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.metrics: dict[str, Counter | Gauge | CallbackCounter | Histogram] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self.register(Counter(name, description))
+
+    def gauge(self, name: str, description: str, callback: Callable) -> Gauge:
+        return self.register(Gauge(name, description, callback))
+
+    def callback_counter(self, name: str, description: str, callback: Callable) -> CallbackCounter:
+        return self.register(CallbackCounter(name, description, callback))
+
+    def histogram(self, name: str, description: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, description, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def observe_latency(histogram: Histogram, **labels: str):
+    """Records the duration of every call of the decorated coroutine function."""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **labels)
+
+        return wrapper
+
+    return decorator
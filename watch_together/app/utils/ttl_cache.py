@@ -0,0 +1,70 @@
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class AsyncTTLCache:
+    """Bounded LRU cache with per-entry expiry that coalesces concurrent loads of the same key.
+
+    While a key is being loaded, other callers await the same future instead of
+    starting their own load. Failed loads are not cached.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.pending: dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return default
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None):
+        self.entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        self.entries.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        marker = object()
+        return self.get(key, marker) is not marker
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        marker = object()
+        value = self.get(key, marker)
+        if value is not marker:
+            return value
+
+        future = self.pending.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self.pending[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as ex:
+            future.set_exception(ex)
+            # Mark the exception as retrieved when nobody else was waiting for it
+            future.exception()
+            raise
+        finally:
+            self.pending.pop(key, None)
+        self.set(key, value)
+        future.set_result(value)
+        return value